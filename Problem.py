@@ -1,5 +1,5 @@
+import hashlib
 import logging
-from itertools import combinations
 import numpy as np
 import matplotlib.pyplot as plt
 import networkx as nx
@@ -7,7 +7,7 @@ from icecream import ic
 
 
 class Problem:
-    _graph: nx.Graph
+    _graph: nx.Graph | None
     _alpha: float
     _beta: float
 
@@ -19,29 +19,167 @@ class Problem:
         beta: float = 1.0,
         density: float = 0.5,
         seed: int = 42,
+        construction: str = 'compatible',
     ):
+        """
+        construction: 'compatible' draws the random stream in bulk but consumes it
+            exactly like the original pair-by-pair loop, so a seed always gives the
+            same graph. 'fast' only draws the edges that exist (not one number per
+            pair), which is much cheaper for sparse graphs but gives a different
+            graph for the same seed.
+        """
         rng = np.random.default_rng(seed)
         self._alpha = alpha
         self._beta = beta
+        self._seed = seed
+        self._density = density
         cities = rng.random(size=(num_cities, 2))
         cities[0, 0] = cities[0, 1] = 0.5
 
-        self._graph = nx.Graph()
-        self._graph.add_node(0, pos=(cities[0, 0], cities[0, 1]), gold=0)
-        for c in range(1, num_cities):
-            self._graph.add_node(c, pos=(cities[c, 0], cities[c, 1]), gold=(1 + 999 * rng.random()))
+        # Gold is drawn in one call: the stream is the same as one draw per city
+        gold = np.zeros(num_cities)
+        gold[1:] = 1 + 999 * rng.random(num_cities - 1)
 
-        tmp = cities[:, np.newaxis, :] - cities[np.newaxis, :, :]
-        d = np.sqrt(np.sum(np.square(tmp), axis=-1))
-        for c1, c2 in combinations(range(num_cities), 2):
-            if rng.random() < density or c2 == c1 + 1:
-                self._graph.add_edge(c1, c2, dist=d[c1, c2])
+        if construction == 'compatible':
+            edge_u, edge_v = self._draw_edges_compatible(rng, num_cities, density)
+        elif construction == 'fast':
+            edge_u, edge_v = self._draw_edges_fast(rng, num_cities, density)
+        else:
+            raise ValueError(f"Unknown construction mode: {construction!r}")
+        edge_dist = np.sqrt(np.sum(np.square(cities[edge_u] - cities[edge_v]), axis=-1))
 
-        assert nx.is_connected(self._graph)
+        # Array copies of the instance, shared read-only by the accessors below
+        for arr in (cities, gold, edge_u, edge_v, edge_dist):
+            arr.flags.writeable = False
+        self._positions = cities
+        self._gold = gold
+        self._edges = (edge_u, edge_v, edge_dist)
+
+        # The chain c -> c+1 is always drawn, so the graph is connected. The
+        # networkx graph is only built on first access (see _nx_graph).
+        assert np.count_nonzero(edge_v == edge_u + 1) == num_cities - 1
+        self._graph = None
+
+    @staticmethod
+    def _draw_edges_compatible(rng, num_cities, density, block_pairs=1 << 21):
+        """
+        One draw per pair in itertools.combinations order (row-major upper triangle).
+        Rows are processed in blocks to keep memory bounded on large instances.
+        """
+        counts = num_cities - 1 - np.arange(max(num_cities - 1, 0))
+        ends = np.cumsum(counts)
+        starts = ends - counts
+
+        edge_u, edge_v = [], []
+        first = 0
+        while first < num_cities - 1:
+            # Take as many rows as fit in the block (at least one)
+            last = int(np.searchsorted(ends, starts[first] + block_pairs, side='right'))
+            last = max(last, first + 1)
+
+            u = np.repeat(np.arange(first, last), counts[first:last])
+            flat = np.arange(starts[first], ends[last - 1])
+            v = flat - np.repeat(starts[first:last], counts[first:last]) + u + 1
+
+            mask = (rng.random(len(u)) < density) | (v == u + 1)
+            edge_u.append(u[mask])
+            edge_v.append(v[mask])
+            first = last
+
+        if not edge_u:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(edge_u), np.concatenate(edge_v)
+
+    @staticmethod
+    def _draw_edges_fast(rng, num_cities, density):
+        """
+        Sample the number of random edges, then which pairs they are.
+        The chain c -> c+1 is always added to keep the graph connected.
+        """
+        num_pairs = num_cities * (num_cities - 1) // 2
+        num_edges = rng.binomial(num_pairs, min(max(density, 0.0), 1.0))
+        picked = rng.choice(num_pairs, size=num_edges, replace=False)
+
+        # Flat upper-triangle index of every chain edge (c, c+1)
+        rows = np.arange(num_cities - 1)
+        row_start = rows * num_cities - rows * (rows + 1) // 2
+        flat = np.union1d(picked, row_start)
+
+        u = np.searchsorted(row_start, flat, side='right') - 1
+        v = flat - row_start[u] + u + 1
+        return u, v
+
+    def _nx_graph(self) -> nx.Graph:
+        """
+        The instance as a networkx graph, built from the arrays on first use:
+        the solvers only read the arrays, and building it is costly on large
+        instances.
+        """
+        if self._graph is None:
+            cities, gold = self._positions, self._gold
+            edge_u, edge_v, edge_dist = self._edges
+            self._graph = nx.Graph()
+            self._graph.add_nodes_from(
+                (c, {'pos': (cities[c, 0], cities[c, 1]), 'gold': g})
+                for c, g in enumerate(gold.tolist())
+            )
+            self._graph.add_weighted_edges_from(
+                zip(edge_u.tolist(), edge_v.tolist(), edge_dist.tolist()), weight='dist'
+            )
+        return self._graph
 
     @property
     def graph(self) -> nx.Graph:
-        return nx.Graph(self._graph)
+        """
+        Read-only view of the instance graph. It shares the underlying data, so
+        it is O(1) to obtain; use copy_graph() when a mutable copy is needed.
+        """
+        return self._nx_graph().copy(as_view=True)
+
+    def copy_graph(self) -> nx.Graph:
+        """Independent, mutable copy of the instance graph"""
+        return nx.Graph(self._nx_graph())
+
+    @property
+    def num_cities(self) -> int:
+        return len(self._positions)
+
+    @property
+    def positions(self) -> np.ndarray:
+        """(num_cities, 2) read-only array of city coordinates"""
+        return self._positions
+
+    @property
+    def gold(self) -> np.ndarray:
+        """(num_cities,) read-only array of gold per city (0 at the depot)"""
+        return self._gold
+
+    @property
+    def edges(self):
+        """
+        Adjacency structure as read-only arrays (u, v, dist), one entry per
+        undirected edge with u < v.
+        """
+        return self._edges
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def density(self):
+        return self._density
+
+    def fingerprint(self) -> str:
+        """
+        Identifier of the instance graph (alpha and beta are not included, they
+        only affect the cost function): seed, size, density and a hash of the
+        positions, gold and edge arrays.
+        """
+        digest = hashlib.sha1()
+        for arr in (self._positions, self._gold, *self._edges):
+            digest.update(np.ascontiguousarray(arr).tobytes())
+        return f"n{self.num_cities}_d{self._density:g}_s{self._seed}_{digest.hexdigest()[:16]}"
 
     @property
     def alpha(self):
@@ -52,19 +190,30 @@ class Problem:
         return self._beta
 
     def cost(self, path, weight):
-        dist = nx.path_weight(self._graph, path, weight='dist')
+        dist = nx.path_weight(self._nx_graph(), path, weight='dist')
         return dist + (self._alpha * dist * weight) ** self._beta
 
+    def cost_many(self, dists, weights):
+        """
+        Vectorized cost: same formula as cost() applied element-wise.
+        dists and weights are broadcast together, so a whole tour (1-D) or a
+        batch of tours (2-D) can be priced in one call. Returns per-leg costs.
+        """
+        dists = np.asarray(dists, dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        return dists + (self._alpha * dists * weights) ** self._beta
+
     def baseline(self):
+        graph = self._nx_graph()
         total_cost = 0
-        all_paths_di = nx.single_source_dijkstra_path(self._graph, source=0, weight='dist')
+        all_paths_di = nx.single_source_dijkstra_path(graph, source=0, weight='dist')
         for dest, path in nx.single_source_dijkstra_path(
-            self._graph, source=0, weight='dist'
+            graph, source=0, weight='dist'
         ).items():
             cost = 0
             for c1, c2 in zip(path, path[1:]):
                 cost += self.cost([c1, c2], 0)
-                cost += self.cost([c1, c2], self._graph.nodes[dest]['gold'])
+                cost += self.cost([c1, c2], graph.nodes[dest]['gold'])
             logging.debug(
                 f"dummy_solution: go to {dest} ({' > '.join(str(n) for n in path)} ({cost})"
             )
@@ -73,8 +222,9 @@ class Problem:
 
     def plot(self):
         plt.figure(figsize=(10, 10))
-        pos = nx.get_node_attributes(self._graph, 'pos')
-        size = [100] + [self._graph.nodes[n]['gold'] for n in range(1, len(self._graph))]
-        color = ['red'] + ['lightblue'] * (len(self._graph) - 1)
-        return nx.draw(self._graph, pos, with_labels=True, node_color=color, node_size=size)
+        graph = self._nx_graph()
+        pos = nx.get_node_attributes(graph, 'pos')
+        size = [100] + [graph.nodes[n]['gold'] for n in range(1, len(graph))]
+        color = ['red'] + ['lightblue'] * (len(graph) - 1)
+        return nx.draw(graph, pos, with_labels=True, node_color=color, node_size=size)
     
\ No newline at end of file
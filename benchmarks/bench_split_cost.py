@@ -0,0 +1,80 @@
+"""
+Micro-benchmark of the Split DP leg cost: the original per-leg formula
+d + (alpha*d*w)^beta against the factorized d + A[i,j] * w^beta used by
+split_dp. Both read the same pre-gathered leg lists. Run from the
+repository root:
+
+    python benchmarks/bench_split_cost.py
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Problem import Problem
+from src.evaluation_core import MAX_TRIP_SIZE, _route_legs, split_dp
+from src.hybrid_aco.precompute import PrecomputedData
+
+
+def split_cost_per_leg(route, precomputed):
+    """
+    Split DP pricing every leg with the full power (alpha*d*w)^beta. It reads
+    the same pre-gathered lists as split_dp, so only the leg cost differs.
+    """
+    out_d, _, back_d, _, leg_d, _, golds = _route_legs(route, precomputed)
+    alpha, beta = precomputed.alpha, precomputed.beta
+    n = len(route)
+    V = [0.0] + [float('inf')] * n
+    P = [0] * (n + 1)
+    for i in range(n):
+        V_i = V[i]
+        trip_cost = out_d[i] + (alpha * out_d[i] * 0.0) ** beta
+        load = 0.0
+        for j in range(i + 1, min(i + MAX_TRIP_SIZE, n) + 1):
+            k = j - 1
+            if j > i + 1:
+                d = leg_d[k - 1]
+                trip_cost += d + (alpha * d * load) ** beta
+            load += golds[k]
+            d = back_d[k]
+            total = V_i + trip_cost + d + (alpha * d * load) ** beta
+            if total < V[j]:
+                V[j] = total
+                P[j] = i
+    return V[n]
+
+
+def _best_time(split_cost, routes, precomputed, repeats):
+    """Fastest of `repeats` passes over the routes, and the costs"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        costs = [split_cost(route, precomputed) for route in routes]
+        best = min(best, time.perf_counter() - start)
+    return best, costs
+
+
+def main(sizes=((100, 1.0), (200, 2.0), (400, 2.0)), num_routes=50, repeats=5):
+    for n, beta in sizes:
+        problem = Problem(n, density=0.5, beta=beta, seed=3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            precomputed = PrecomputedData(problem)
+        random.seed(1)
+        routes = [random.sample(range(1, n), n - 1) for _ in range(num_routes)]
+
+        old_time, old = _best_time(split_cost_per_leg, routes, precomputed, repeats)
+        new_time, new = _best_time(lambda route, pre: split_dp(route, pre)[0][-1],
+                                   routes, precomputed, repeats)
+
+        worst = max(abs(a - b) / a for a, b in zip(old, new))
+        print(f"n={n:4d} beta={beta}: per-leg {old_time / num_routes * 1000:7.2f} ms/route, "
+              f"factorized {new_time / num_routes * 1000:7.2f} ms/route, "
+              f"speedup {old_time / new_time:5.1f}x, max rel diff {worst:.1e}")
+
+
+if __name__ == '__main__':
+    main()
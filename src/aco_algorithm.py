@@ -1,7 +1,13 @@
 from Problem import Problem
 from src.aco_pheromone import PheromoneMatrix
 from src.aco_ant import Ant, evaluate_aco_solution
+from src.aco_colony import construct_colony, colony_solutions
+from src.aco_parallel import ParallelColony
+from src.aco_mmas import mmas_bounds, use_best_so_far, is_stagnant
+from src.stopping import StoppingPolicy
+from src.hybrid_aco.precompute import PrecomputedData
 import random
+import numpy as np
 
 def ant_colony_optimization(
     problem: Problem,
@@ -12,20 +18,53 @@ def ant_colony_optimization(
     rho=0.1,             
     Q=100,               # Pheromone deposit factor
     elite_weight=2.0,    # Extra pheromone for best solution
-    verbose=True
+    verbose=True,
+    stopping=None,       # Optional StoppingPolicy
+    precomputed=None,    # PrecomputedData used to price the solutions
+    cache_dir=None,
+    ant_mode='sequential', # 'sequential': one Ant at a time, 'colony': all ants in lockstep
+    num_workers=None,      # Build (and price) the ants of each iteration in this many processes
+    pheromone_dtype=np.float64, # np.float32 halves the pheromone memory traffic
+    variant='as',          # 'as': every ant deposits (+ elite), 'mmas': MAX-MIN Ant System
+    p_best=0.05,           # MMAS: sets tau_min relative to tau_max
+    stagnation_slack=0.05  # MMAS: reset when the branching factor is within this of one route
 ):
     """
     Ant Colony Optimization for TTP
+    
+    ant_mode='colony' builds the solutions of an iteration together with
+    array operations (construct_colony); the time budget is then checked per
+    iteration instead of per ant.
+    num_workers > 1 splits the ants of each iteration into colony chunks built
+    in worker processes (ParallelColony); results are reproducible for a given
+    seed and number of workers.
+    
+    variant='mmas': only one solution deposits (iteration-best, then more
+    and more often the best-so-far), pheromone is kept within bounds derived
+    from the best cost, and it is reset to tau_max when the lambda-branching
+    factor shows that the colony has converged on a single route.
     """
+    if variant not in ('as', 'mmas'):
+        raise ValueError(f"unknown variant {variant!r}: use 'as' or 'mmas'")
     
-    num_cities = len(problem.graph.nodes)
+    stopping = stopping or StoppingPolicy()
+    stopping.start()
+    num_cities = problem.num_cities
+    if precomputed is None:
+        precomputed = PrecomputedData(problem, cache_dir=cache_dir)
     
     # Initialize pheromone matrix
-    pheromone = PheromoneMatrix(num_cities, initial_pheromone=1.0)
+    pheromone = PheromoneMatrix(num_cities, initial_pheromone=1.0, dtype=pheromone_dtype)
+    parallel = num_workers is not None and num_workers > 1
+    if parallel:
+        ant_mode = 'colony'
+    rng = np.random.default_rng(random.getrandbits(32)) if ant_mode == 'colony' else None
+    pool = ParallelColony(precomputed, pheromone, num_workers) if parallel else None
     
     # Track best solution found
     best_solution = None
     best_cost = float('inf')
+    since_reset = None  # MMAS: iterations since the last pheromone (re)initialization
     
     if verbose:
         print("=" * 60)
@@ -35,57 +74,123 @@ def ant_colony_optimization(
         print(f"Alpha: {alpha}, Beta: {beta}, Rho: {rho}")
         print()
     
-    # Main ACO loop
-    for iteration in range(num_iterations):
-        # Store all solutions from this iteration
-        iteration_solutions = []
-        
-        # Each ant constructs a solution
-        for ant_id in range(num_ants):
-            # Create ant
-            ant = Ant(problem, pheromone, alpha=alpha, beta=beta)
+    try:
+        # Main ACO loop
+        for iteration in range(num_iterations):
+            # Store all solutions from this iteration
+            iteration_solutions = []
             
-            # Ant builds solution
-            solution = ant.construct_solution()
+            if pool is not None:
+                cities, returns, costs = pool.construct_basic(pheromone, num_ants, alpha, beta, rng)
+                colony = colony_solutions(cities, returns, precomputed.gold_array)
+                for solution, cost in zip(colony, costs.tolist()):
+                    solution.total_cost = cost
+            elif ant_mode == 'colony':
+                colony = construct_colony(precomputed, pheromone, num_ants, alpha, beta, rng)
             
-            # Evaluate solution
-            cost = evaluate_aco_solution(solution, problem)
-            
-            iteration_solutions.append(solution)
+            # Each ant constructs a solution
+            for ant_id in range(num_ants):
+                if ant_mode == 'colony':
+                    solution = colony[ant_id]
+                else:
+                    # Create ant
+                    ant = Ant(problem, pheromone, alpha=alpha, beta=beta, precomputed=precomputed)
+                    
+                    # Ant builds solution
+                    solution = ant.construct_solution()
+                
+                # Evaluate solution (workers already priced theirs)
+                if solution.total_cost is None:
+                    cost = evaluate_aco_solution(solution, problem, precomputed)
+                else:
+                    cost = solution.total_cost
+                
+                iteration_solutions.append(solution)
+                stopping.add_evaluations()
+                
+                # Update best solution
+                if cost < best_cost:
+                    best_cost = cost
+                    best_solution = solution
+                    
+                    if verbose:
+                        print(f"Iteration {iteration}, Ant {ant_id}: New best cost = {best_cost:.2f}")
+                
+                # Hard time limit: do not wait for the rest of the colony
+                if stopping.out_of_time():
+                    break
             
-            # Update best solution
-            if cost < best_cost:
-                best_cost = cost
-                best_solution = solution
+            if variant == 'mmas':
+                since_reset = _mmas_update(pheromone, iteration_solutions, best_solution, since_reset,
+                                           rho, Q, p_best, stagnation_slack, verbose)
+            else:
+                # Pheromone evaporation
+                pheromone.evaporate(rho)
                 
-                if verbose:
-                    print(f"Iteration {iteration}, Ant {ant_id}: New best cost = {best_cost:.2f}")
-        
-        # Pheromone evaporation
-        pheromone.evaporate(rho)
-        
-        # Pheromone deposit
-        for solution in iteration_solutions:
-            # Amount of pheromone to deposit (inversely proportional to cost)
-            # Better solutions (lower cost) deposit MORE pheromone
-            deposit_amount = Q / solution.total_cost
+                # Pheromone deposit, all routes in one scatter
+                # Amount of pheromone to deposit (inversely proportional to cost)
+                # Better solutions (lower cost) deposit MORE pheromone
+                routes = [solution.visited_order for solution in iteration_solutions]
+                amounts = [Q / solution.total_cost for solution in iteration_solutions]
+                
+                # Elite strategy: best solution deposits extra pheromone
+                if best_solution:
+                    routes.append(best_solution.visited_order)
+                    amounts.append((Q / best_solution.total_cost) * elite_weight)
+                
+                pheromone.deposit_many(routes, amounts)
+            
+            # Progress report
+            if verbose and iteration % 10 == 0:
+                avg_cost = sum(s.total_cost for s in iteration_solutions) / len(iteration_solutions)
+                print(f"Iteration {iteration}: Best={best_cost:.2f}, Avg={avg_cost:.2f}")
             
-            # Deposit pheromone along the route
-            pheromone.deposit(solution.visited_order, deposit_amount)
+            if stopping.should_stop(best_cost):
+                break
         
-        # Elite strategy: best solution deposits extra pheromone
-        if best_solution:
-            elite_amount = (Q / best_solution.total_cost) * elite_weight
-            pheromone.deposit(best_solution.visited_order, elite_amount)
+        stopping.finish()
+        if best_solution is not None and not best_solution.path_steps:
+            evaluate_aco_solution(best_solution, problem, precomputed)
+        if verbose:
+            print()
+            print(f"Final best cost: {best_cost:.2f}")
+            print(stopping.summary())
+            print("=" * 60)
         
-        # Progress report
-        if verbose and iteration % 10 == 0:
-            avg_cost = sum(s.total_cost for s in iteration_solutions) / len(iteration_solutions)
-            print(f"Iteration {iteration}: Best={best_cost:.2f}, Avg={avg_cost:.2f}")
+        return best_solution
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+def _mmas_update(pheromone, iteration_solutions, best_solution, since_reset,
+                 rho, Q, p_best, stagnation_slack, verbose):
+    """
+    One MAX-MIN Ant System pheromone update. Returns the new number of
+    iterations since the last (re)initialization (None before the first one).
+    """
+    tau_min, tau_max = mmas_bounds(best_solution.total_cost, rho, pheromone.num_cities, Q, p_best)
+    if since_reset is None:
+        # Start from the upper bound: all edges equally attractive
+        pheromone.reset(tau_max)
+        since_reset = 0
     
-    if verbose:
-        print()
-        print(f"Final best cost: {best_cost:.2f}")
-        print("=" * 60)
+    # Iteration-best early on, best-so-far more and more often later
+    if use_best_so_far(since_reset):
+        depositor = best_solution
+    else:
+        depositor = min(iteration_solutions, key=lambda s: s.total_cost)
+    
+    # Deposit on the edges the ants actually chose (city to next city); the
+    # depot returns are decided afterwards and are not pheromone choices
+    route = [0] + [city for city in depositor.visited_order if city != 0] + [0]
+    pheromone.evaporate(rho, tau_min=tau_min)
+    pheromone.deposit(route, Q / depositor.total_cost)
+    pheromone.clamp(tau_min, tau_max)
     
-    return best_solution
\ No newline at end of file
+    if is_stagnant(pheromone.pheromone, tau_min, tau_max, len(route) - 1, slack=stagnation_slack):
+        if verbose:
+            print(f"Stagnation after {since_reset + 1} iterations: pheromone reset")
+        pheromone.reset(tau_max)
+        return 0
+    return since_reset + 1
@@ -1,45 +1,42 @@
 import random
-import networkx as nx
 import numpy as np
 from src.aco_solution import ACOSolution
+from src.evaluation_core import returns_cost, returns_path_steps
+from src.hybrid_aco.precompute import PrecomputedData
 
 class Ant:
     """
     An ant constructs a solution by visiting cities
     """
-    def __init__(self, problem, pheromone_matrix, alpha=1.0, beta=2.0):
+    def __init__(self, problem, pheromone_matrix, alpha=1.0, beta=2.0, precomputed=None):
         """
         problem: Problem instance
         pheromone_matrix: PheromoneMatrix instance
         alpha: pheromone importance (from your notes)
         beta: heuristic importance (from your notes)
+        precomputed: PrecomputedData shared by the colony (shortest-path
+            distances); built here if not given
         """
         self.problem = problem
-        self.graph = problem.graph
         self.pheromone = pheromone_matrix
         self.alpha = alpha  # Pheromone weight
         self.beta = beta    # Heuristic weight
         
+        if precomputed is None:
+            precomputed = PrecomputedData(problem)
+        self.data = precomputed
+        self.distances = np.asarray(precomputed.all_distances)
+        self.gold = np.asarray(precomputed.gold_array, dtype=float)
+        
         self.current_city = 0
         self.current_load = 0.0
-        self.unvisited = set(range(1, len(self.graph.nodes)))  # All cities except depot
+        self.unvisited = np.ones(problem.num_cities, dtype=bool)  # Mask of cities still to visit
+        self.unvisited[0] = False                                 # All cities except depot
         self.solution = None
-        
-        # Cache for paths
-        self.path_cache = {}
-    
-    def get_shortest_path(self, u, v):
-        """Get cached shortest path"""
-        if (u, v) in self.path_cache:
-            return self.path_cache[(u, v)]
-        
-        path = nx.shortest_path(self.graph, source=u, target=v, weight='dist')
-        self.path_cache[(u, v)] = path
-        return path
     
-    def calculate_heuristic(self, city):
+    def calculate_heuristics(self):
         """
-        Heuristic: How attractive is this city?
+        Heuristic: How attractive is each city?
         
         "heuristic[i][j] = gold[j] / (distance[i][j] * (1 + current_weight))"
         
@@ -47,21 +44,15 @@ class Ant:
         - High gold amount = more attractive
         - Short distance = more attractive
         - Low current load = more attractive (avoid weight penalty)
-        """
-        gold = self.graph.nodes[city]['gold']
-        
-        try:
-            path = self.get_shortest_path(self.current_city, city)
-            distance = nx.path_weight(self.graph, path, weight='dist')
-        except:
-            return 0.0
-        
-        if distance == 0:
-            return 0.0
         
-        attractiveness = gold / (distance * (1 + self.current_load / 1000))
-        
-        return attractiveness
+        Computed for all cities at once from the distance row of the current
+        city; cities at distance 0 (or unreachable) get 0.
+        """
+        distances = self.distances[self.current_city]
+        eta = np.zeros(len(distances))
+        reachable = (distances > 0) & np.isfinite(distances)
+        eta[reachable] = self.gold[reachable] / (distances[reachable] * (1 + self.current_load / 1000))
+        return eta
     
     def select_next_city(self):
         """
@@ -69,39 +60,29 @@ class Ant:
         
         P[i][j] = (pheromone[i][j]^alpha * heuristic[i][j]^beta) / Σ(...)
         """
-        if not self.unvisited:
+        cities = np.flatnonzero(self.unvisited)
+        if len(cities) == 0:
             return None
         
-        # Calculate probabilities for each unvisited city
-        probabilities = []
-        cities = list(self.unvisited)
+        # Pheromone levels and heuristic values of the unvisited cities
+        tau = self.pheromone.pheromone[self.current_city, cities]
+        eta = self.calculate_heuristics()[cities]
         
-        for city in cities:
-            # Pheromone level
-            tau = self.pheromone.get(self.current_city, city)
-            
-            # Heuristic value
-            eta = self.calculate_heuristic(city)
-            
-            # Combined probability (from your notes formula)
-            if eta > 0:
-                prob = (tau ** self.alpha) * (eta ** self.beta)
-            else:
-                prob = tau ** self.alpha  # Only pheromone if heuristic is zero
-            
-            probabilities.append(prob)
+        # Combined probability (from your notes formula);
+        # only pheromone where the heuristic is zero
+        probabilities = tau ** self.alpha
+        positive = eta > 0
+        probabilities[positive] *= eta[positive] ** self.beta
         
-        # Normalize probabilities
-        total = sum(probabilities)
+        cumulative = np.cumsum(probabilities)
+        total = cumulative[-1]
         if total == 0:
             # Fallback: uniform random
-            return random.choice(cities)
+            return int(random.choice(cities))
         
-        probabilities = [p / total for p in probabilities]
-        
-        # Roulette wheel selection
-        selected = random.choices(cities, weights=probabilities, k=1)[0]
-        return selected
+        # Roulette wheel selection (same draw as random.choices)
+        index = np.searchsorted(cumulative, random.random() * total, side='right')
+        return int(cities[min(index, len(cities) - 1)])
     
     def decide_gold_amount(self, city):
         """
@@ -109,14 +90,14 @@ class Ant:
         
         Strategy: decide according to the value of the beta
         """
-        available_gold = self.graph.nodes[city]['gold']
+        available_gold = self.gold[city]
         
         # Check if taking all gold would be too expensive
         # if self.problem.beta > 1.5:
         #     return available_gold * 0.5  # Take 50%
         
         # Default: take all gold
-        return available_gold
+        return float(available_gold)
     
     def should_return_to_depot(self, next_city=None):
         """
@@ -129,17 +110,15 @@ class Ant:
         
         # Estimate cost of continuing with current load
         if next_city:
-            try:
-                path = self.get_shortest_path(self.current_city, next_city)
-                distance = nx.path_weight(self.graph, path, weight='dist')
-                marginal_cost = (self.problem.alpha * distance * self.current_load) ** self.problem.beta
-                
-                # Threshold: higher beta = lower threshold (return more often)
-                threshold = 100 / (self.problem.beta ** 1.2)
-                
-                return marginal_cost > threshold
-            except:
+            distance = self.distances[self.current_city, next_city]
+            if not np.isfinite(distance):
                 return False
+            marginal_cost = (self.problem.alpha * distance * self.current_load) ** self.problem.beta
+            
+            # Threshold: higher beta = lower threshold (return more often)
+            threshold = 100 / (self.problem.beta ** 1.2)
+            
+            return marginal_cost > threshold
         
         return False
     
@@ -147,17 +126,16 @@ class Ant:
         """
         Build a complete solution by visiting all cities
         """
-        from src.aco_solution import ACOSolution
-        
         solution = ACOSolution()
         
         self.current_city = 0
         self.current_load = 0.0
-        self.unvisited = set(range(1, len(self.graph.nodes)))
+        self.unvisited = np.ones(self.problem.num_cities, dtype=bool)
+        self.unvisited[0] = False
         
         visited_order = [0]  # Track path for pheromone deposit
         
-        while self.unvisited:
+        for _ in range(self.problem.num_cities - 1):
             # Select next city
             next_city = self.select_next_city()
             
@@ -182,7 +160,7 @@ class Ant:
             # Update state
             self.current_load += gold_amount
             self.current_city = next_city
-            self.unvisited.remove(next_city)
+            self.unvisited[next_city] = False
         
         # Return to depot at end
         visited_order.append(0)
@@ -193,62 +171,16 @@ class Ant:
         self.solution = solution
         return solution
 
-def evaluate_aco_solution(solution: ACOSolution, problem):
+def evaluate_aco_solution(solution: ACOSolution, problem, precomputed):
     """
     Calculate the cost of an ACO solution
-    Similar to GA evaluation but works with ACO route format
+    The route is an explicit-returns tour ((0, 0) marks a depot visit),
+    priced by the shared evaluation core
     """
+    stops = [city for city, _ in solution.route]
+    golds = [gold for _, gold in solution.route]
     
-    total_cost = 0.0
-    current_city = 0
-    current_load = 0.0
-    path_steps = []
-    
-    path_cache = {}
-    
-    def get_path(u, v):
-        if (u, v) in path_cache:
-            return path_cache[(u, v)]
-        path = nx.shortest_path(problem.graph, u, v, weight='dist')
-        path_cache[(u, v)] = path
-        return path
-    
-    for city, gold in solution.route:
-        if city == 0:
-            # Return to depot (unload)
-            if current_city != 0:
-                path = get_path(current_city, 0)
-                cost = problem.cost(path, current_load)
-                total_cost += cost
-                
-                for node in path[1:]:
-                    path_steps.append((node, 0))
-                
-                current_city = 0
-                current_load = 0.0
-        else:
-            # Visit city and collect gold
-            path = get_path(current_city, city)
-            cost = problem.cost(path, current_load)
-            total_cost += cost
-            
-            for node in path[1:]:
-                g = gold if node == city else 0
-                path_steps.append((node, g))
-            
-            current_city = city
-            current_load += gold
-    
-    # Final return to depot
-    if current_city != 0:
-        path = get_path(current_city, 0)
-        cost = problem.cost(path, current_load)
-        total_cost += cost
-        
-        for node in path[1:]:
-            path_steps.append((node, 0))
-    
-    solution.total_cost = total_cost
-    solution.path_steps = path_steps
+    solution.total_cost = returns_cost(precomputed, stops, golds)
+    solution.path_steps = returns_path_steps(precomputed, stops, golds)
     
-    return total_cost
+    return solution.total_cost
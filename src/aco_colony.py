@@ -0,0 +1,108 @@
+import numpy as np
+from src.aco_solution import ACOSolution
+
+
+def roulette_select(weights, rng):
+    """
+    One roulette wheel draw per row of `weights` (ants x cities), using a
+    cumulative sum and a per-row searchsorted. Every row needs a positive
+    total: callers replace all-zero rows by their uniform fallback first.
+    """
+    cumulative = np.cumsum(weights, axis=1)
+    total = cumulative[:, -1]
+    draws = rng.random(len(weights)) * total
+    # Per-row searchsorted(side='right'): number of prefix sums <= draw
+    index = (cumulative <= draws[:, None]).sum(axis=1)
+    return np.minimum(index, weights.shape[1] - 1)
+
+
+def construct_colony(precomputed, pheromone, num_ants, alpha=1.0, beta=2.0, rng=None):
+    """
+    Colony construction for the basic ACO: all ants advance together, one
+    vectorized step per city, with the same rules as Ant.construct_solution
+    (heuristic gold / (distance * (1 + load/1000)), roulette selection,
+    return to the depot when the weight penalty of the next leg is too high).
+    Returns a list of num_ants ACOSolution objects (not evaluated).
+    """
+    cities, returns = construct_colony_arrays(precomputed, pheromone, num_ants, alpha, beta, rng)
+    return colony_solutions(cities, returns, precomputed.gold_array)
+
+
+def construct_colony_arrays(precomputed, pheromone, num_ants, alpha=1.0, beta=2.0, rng=None):
+    """
+    Array core of construct_colony. Keeps an ants x cities visited mask, a
+    current-city vector and a load vector.
+    Returns (cities, returns): ants x (n-1) visit order, and whether the ant
+    went back to the depot just before each visit.
+    """
+    rng = rng or np.random.default_rng()
+    n = precomputed.num_cities
+    D = np.asarray(precomputed.all_distances)
+    gold = np.asarray(precomputed.gold_array, dtype=float)
+    tau = pheromone.pheromone
+    threshold = 100 / (precomputed.beta ** 1.2)
+
+    rows = np.arange(num_ants)
+    visited = np.zeros((num_ants, n), dtype=bool)
+    visited[:, 0] = True
+    current = np.zeros(num_ants, dtype=np.intp)
+    load = np.zeros(num_ants)
+    cities = np.zeros((num_ants, n - 1), dtype=np.int32)
+    returns = np.zeros((num_ants, n - 1), dtype=bool)
+
+    for step in range(n - 1):
+        distances = D[current]
+        eta = np.zeros_like(distances)
+        reachable = (distances > 0) & np.isfinite(distances)
+        np.divide(gold, distances * (1 + load[:, None] / 1000), out=eta, where=reachable)
+
+        # tau^alpha * eta^beta, only pheromone where the heuristic is zero
+        weights = tau[current] ** alpha
+        positive = eta > 0
+        weights[positive] *= eta[positive] ** beta
+        weights[visited] = 0.0
+
+        # Uniform fallback for ants whose weights are all zero
+        empty = weights.sum(axis=1) == 0
+        if empty.any():
+            weights[empty] = ~visited[empty]
+        next_city = roulette_select(weights, rng)
+
+        # Return to depot first if the next leg is too heavy
+        marginal = (precomputed.alpha * D[current, next_city] * load) ** precomputed.beta
+        back = (load > 0) & np.isfinite(marginal) & (marginal > threshold)
+
+        cities[:, step] = next_city
+        returns[:, step] = back
+        visited[rows, next_city] = True
+        load = np.where(back, 0.0, load) + gold[next_city]
+        current = next_city
+
+    return cities, returns
+
+
+def colony_stops(cities, returns):
+    """Explicit-returns stop sequence (0 = depot visit) of one ant"""
+    stops = np.zeros(len(cities) + int(returns.sum()), dtype=np.int32)
+    positions = np.arange(len(cities)) + np.cumsum(returns)
+    stops[positions] = cities
+    return stops
+
+
+def colony_solutions(cities, returns, gold):
+    """ACOSolution objects (route and visited_order) from construct_colony_arrays output"""
+    gold = np.asarray(gold, dtype=float).tolist()
+    solutions = []
+    for ant_cities, ant_returns in zip(cities.tolist(), returns.tolist()):
+        solution = ACOSolution()
+        visited_order = [0]
+        for city, back in zip(ant_cities, ant_returns):
+            if back:
+                visited_order.append(0)
+                solution.add_visit(0, 0, return_to_depot=True)
+            solution.add_visit(city, gold[city])
+            visited_order.append(city)
+        visited_order.append(0)
+        solution.visited_order = visited_order
+        solutions.append(solution)
+    return solutions
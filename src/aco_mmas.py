@@ -0,0 +1,54 @@
+import numpy as np
+
+
+def mmas_bounds(best_cost, rho, num_cities, Q=1.0, p_best=0.05):
+    """
+    MAX-MIN Ant System pheromone limits derived from the best cost so far:
+    tau_max = Q / (rho * best_cost), the level a best-route edge converges to,
+    and tau_min chosen so that a converged colony still rebuilds the best
+    route with probability about p_best.
+    Returns (tau_min, tau_max).
+    """
+    tau_max = Q / (rho * best_cost)
+    p_dec = p_best ** (1.0 / max(num_cities, 1))
+    avg_choices = max(num_cities / 2 - 1, 1)
+    tau_min = tau_max * (1 - p_dec) / (avg_choices * p_dec)
+    return min(tau_min, tau_max), tau_max
+
+
+def use_best_so_far(iterations_since_reset):
+    """
+    Deposit schedule: the iteration-best ant deposits early after a (re)start
+    (exploration), the best-so-far solution increasingly often later on.
+    """
+    if iterations_since_reset < 25:
+        return False
+    if iterations_since_reset < 75:
+        every = 5
+    elif iterations_since_reset < 125:
+        every = 3
+    elif iterations_since_reset < 250:
+        every = 2
+    else:
+        every = 1
+    return iterations_since_reset % every == 0
+
+
+def branching_factor(tau, tau_min, tau_max, lam=0.05):
+    """
+    lambda-branching factor: mean number of edges per city whose pheromone is
+    above tau_min + lam * (tau_max - tau_min). Uses the global bounds instead
+    of per-city ones, so it is a single pass over the matrix.
+    """
+    cut = tau_min + lam * (tau_max - tau_min)
+    return np.count_nonzero(tau >= cut) / len(tau)
+
+
+def is_stagnant(tau, tau_min, tau_max, route_length, slack=0.05, lam=0.05):
+    """
+    True when only the edges of about one route (route_length edges, both
+    directions) still carry pheromone clearly above tau_min, i.e. every ant
+    is rebuilding the same solution.
+    """
+    route_branching = 2 * route_length / len(tau)
+    return branching_factor(tau, tau_min, tau_max, lam) <= route_branching * (1 + slack)
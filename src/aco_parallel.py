@@ -0,0 +1,115 @@
+import numpy as np
+from multiprocessing import get_context
+from src.aco_colony import construct_colony_arrays, colony_stops
+from src.evaluation_core import returns_cost, single_trip_cost
+from src.hybrid_aco.colony import construct_colony_tours
+from src.hybrid_aco.pheromone import PheromoneMatrix as HybridPheromoneMatrix
+from src.shared_arrays import SharedArrays, attach_shared_arrays
+
+
+class _WorkerInstance:
+    """
+    The parts of PrecomputedData ant construction and evaluation need,
+    backed by shared memory, plus the shared pheromone snapshot
+    """
+    def __init__(self, spec, alpha, beta):
+        arrays, self._blocks = attach_shared_arrays(spec)
+        self.all_distances = arrays['all_distances']
+        self.cost_factor = arrays['cost_factor']
+        self.gold_array = arrays['gold_array']
+        self.pheromone = arrays['pheromone']
+        self.num_cities = len(self.gold_array)
+        self.alpha = alpha
+        self.beta = beta
+
+
+_worker_instance = None
+
+def _init_worker(spec, alpha, beta):
+    global _worker_instance
+    _worker_instance = _WorkerInstance(spec, alpha, beta)
+
+
+def _basic_chunk(task):
+    """Basic ACO ants of one chunk: (cities, returns, costs)"""
+    num_ants, seed, alpha, beta = task
+    data = _worker_instance
+    # The snapshot is only read, so the worker instance can act as the matrix
+    cities, returns = construct_colony_arrays(data, data, num_ants, alpha, beta,
+                                              np.random.default_rng(seed))
+    costs = np.array([returns_cost(data, colony_stops(c, r)) for c, r in zip(cities, returns)])
+    return cities, returns, costs
+
+
+def _hybrid_chunk(task):
+    """Hybrid ACO ants of one chunk: (tours, costs)"""
+    num_ants, seed, alpha, beta, q0, local_rho, bounds = task
+    data = _worker_instance
+    # ACS local updates go to a private copy of the snapshot; the master's
+    # global update is what carries over to the next iteration
+    pheromone = HybridPheromoneMatrix(data.num_cities, initial_pheromone=bounds[0],
+                                      levels=data.pheromone.copy())
+    pheromone.tau_min, pheromone.tau_max = bounds[1], bounds[2]
+    tours = construct_colony_tours(data, pheromone, num_ants, alpha, beta, q0, local_rho,
+                                   np.random.default_rng(seed))
+    costs = np.array([single_trip_cost(data, tour[1:-1]) for tour in tours])
+    return tours, costs
+
+
+class ParallelColony:
+    """
+    Process pool building the ants of an iteration in chunks (colony mode in
+    each worker). Distances, cost factors, gold and a per-iteration pheromone
+    snapshot live in shared memory, so tasks only carry seeds and return
+    int32 tours and their costs; the master applies the global update.
+
+    Chunk seeds are drawn from the master's generator, so a fixed seed gives
+    the same result for a given number of workers.
+    """
+    def __init__(self, precomputed, pheromone, num_workers):
+        self.num_workers = num_workers
+        self.shared = SharedArrays({
+            'all_distances': precomputed.all_distances,
+            'cost_factor': precomputed.cost_factor,
+            'gold_array': precomputed.gold_array,
+            'pheromone': pheromone.pheromone,
+        })
+        self.pool = get_context().Pool(
+            num_workers, initializer=_init_worker,
+            initargs=(self.shared.spec, precomputed.alpha, precomputed.beta)
+        )
+
+    def _tasks(self, pheromone, num_ants, rng, *params):
+        """Publish the pheromone snapshot and split the ants into seeded chunks"""
+        self.shared.arrays['pheromone'][...] = pheromone.pheromone
+        sizes = [len(c) for c in np.array_split(np.arange(num_ants), self.num_workers) if len(c)]
+        seeds = rng.integers(0, 2**32, size=len(sizes))
+        return [(size, int(seed)) + params for size, seed in zip(sizes, seeds)]
+
+    def construct_basic(self, pheromone, num_ants, alpha, beta, rng):
+        """Same output as construct_colony_arrays, plus the cost of each ant"""
+        results = self.pool.map(_basic_chunk, self._tasks(pheromone, num_ants, rng, alpha, beta))
+        cities = np.concatenate([r[0] for r in results])
+        returns = np.concatenate([r[1] for r in results])
+        costs = np.concatenate([r[2] for r in results])
+        return cities, returns, costs
+
+    def construct_hybrid(self, pheromone, num_ants, alpha, beta, q0, rng, local_rho=0.1):
+        """Same output as construct_colony_tours, plus the cost of each tour"""
+        bounds = (pheromone.tau0, pheromone.tau_min, pheromone.tau_max)
+        tasks = self._tasks(pheromone, num_ants, rng, alpha, beta, q0, local_rho, bounds)
+        results = self.pool.map(_hybrid_chunk, tasks)
+        tours = np.concatenate([r[0] for r in results])
+        costs = np.concatenate([r[1] for r in results])
+        return tours, costs
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -4,14 +4,15 @@ class PheromoneMatrix:
     """
     Manages pheromone trails between cities
     """
-    def __init__(self, num_cities, initial_pheromone=1.0):
+    def __init__(self, num_cities, initial_pheromone=1.0, dtype=np.float64):
         """
         Create pheromone matrix
         
         pheromone[i][j] = pheromone level on edge from city i to city j
+        dtype: np.float32 halves the memory traffic of large matrices
         """
         self.num_cities = num_cities
-        self.pheromone = np.ones((num_cities, num_cities)) * initial_pheromone    #All start equal (1.0) - no bias initially
+        self.pheromone = np.full((num_cities, num_cities), initial_pheromone, dtype=dtype)    #All start equal (1.0) - no bias initially
         
         # No pheromone on self-loops (no self-loops)
         np.fill_diagonal(self.pheromone, 0)
@@ -20,17 +21,28 @@ class PheromoneMatrix:
         """Get pheromone level between cities i and j"""
         return self.pheromone[i, j]
     
-    def evaporate(self, rho=0.1):
+    def evaporate(self, rho=0.1, tau_min=0.01):
         """
         Evaporate pheromones (decay over time)
         
         From your notes: "All pheromones decay by a factor (1 - ρ)"
         rho: evaporation rate (0.1 = 10% evaporation)
+        tau_min: floor applied after the decay
         """
-        self.pheromone *= (1 - rho)
+        # In place: no temporary matrices
+        np.multiply(self.pheromone, 1 - rho, out=self.pheromone)
         
         # Ensure minimum pheromone level (avoid zero)
-        self.pheromone = np.maximum(self.pheromone, 0.01)
+        np.maximum(self.pheromone, tau_min, out=self.pheromone)
+    
+    def clamp(self, tau_min, tau_max):
+        """Keep every level within [tau_min, tau_max] (MAX-MIN Ant System)"""
+        np.clip(self.pheromone, tau_min, tau_max, out=self.pheromone)
+    
+    def reset(self, value):
+        """Reinitialize every edge to the same level (e.g. tau_max after stagnation)"""
+        self.pheromone.fill(value)
+        np.fill_diagonal(self.pheromone, 0)
     
     def deposit(self, route, amount):
         """
@@ -39,12 +51,29 @@ class PheromoneMatrix:
         route: list of city indices [0, 3, 7, 2, 5, 0]
         amount: how much pheromone to deposit (usually 1/cost)
         """
-        for i in range(len(route) - 1):
-            city_from = route[i]
-            city_to = route[i + 1]
-            self.pheromone[city_from, city_to] += amount
-            # Symmetric (undirected graph)
-            self.pheromone[city_to, city_from] += amount
+        self.deposit_many([route], [amount])
+    
+    def deposit_many(self, routes, amounts):
+        """
+        Deposit pheromone along several routes at once (e.g. every ant of an
+        iteration): all edges are stacked and scattered with a single np.add.at,
+        so repeated edges accumulate as with one deposit call per route.
+        
+        routes: list of city index sequences
+        amounts: pheromone deposited by each route
+        """
+        froms, tos, values = [], [], []
+        for route, amount in zip(routes, amounts):
+            route = np.asarray(route, dtype=np.intp)
+            if len(route) < 2:
+                continue
+            # Both directions (undirected graph)
+            froms += [route[:-1], route[1:]]
+            tos += [route[1:], route[:-1]]
+            values.append(np.full(2 * (len(route) - 1), amount, dtype=self.pheromone.dtype))
+        if froms:
+            np.add.at(self.pheromone, (np.concatenate(froms), np.concatenate(tos)),
+                      np.concatenate(values))
     
     def deposit_on_edges(self, edges, amount):
         """
@@ -52,6 +81,8 @@ class PheromoneMatrix:
         
         edges: list of (city_i, city_j) tuples
         """
-        for city_i, city_j in edges:
-            self.pheromone[city_i, city_j] += amount
-            self.pheromone[city_j, city_i] += amount
\ No newline at end of file
+        if not len(edges):
+            return
+        edges = np.asarray(edges, dtype=np.intp)
+        np.add.at(self.pheromone, (edges[:, 0], edges[:, 1]), amount)
+        np.add.at(self.pheromone, (edges[:, 1], edges[:, 0]), amount)
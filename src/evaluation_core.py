@@ -0,0 +1,350 @@
+"""
+Evaluation core shared by the GA, the ACO and the hybrid ACO.
+
+Every evaluator works on integer city arrays and the precomputed matrices
+(PrecomputedData): leg cost d + A * w^beta with A = (alpha * d)^beta.
+Three modes:
+- single trip: depot -> route -> depot, collecting everything on the way
+- explicit returns: a stop sequence where 0 marks a return to the depot
+- Split: optimal depot returns for a fixed city order (DP, scalar or batched)
+"""
+import numpy as np
+
+# CONSTRAINT: For Beta > 1, trips are short. 
+# Limit Split search to 15 cities max per trip to speed up GA (O(N) instead of O(N^2))
+MAX_TRIP_SIZE = 15
+
+
+def leg_costs(precomputed, froms, tos, loads):
+    """Cost of every leg froms[k] -> tos[k] carried with loads[k] (arrays)"""
+    froms = np.asarray(froms, dtype=np.intp)
+    tos = np.asarray(tos, dtype=np.intp)
+    loads = np.asarray(loads, dtype=float)
+    return precomputed.all_distances[froms, tos] + precomputed.cost_factor[froms, tos] * loads ** precomputed.beta
+
+
+def _stop_golds(precomputed, stops, golds):
+    """Gold picked at each stop (all of it by default, none at the depot)"""
+    if golds is None:
+        golds = precomputed.gold_array[stops]
+        return np.where(stops == 0, 0.0, golds)
+    return np.asarray(golds, dtype=float)
+
+
+def returns_legs(precomputed, stops, golds=None):
+    """
+    Legs (froms, tos, loads) of an explicit-returns tour: start at the depot,
+    visit `stops` in order, unload whenever a stop is 0, end at the depot.
+    golds: gold picked at each stop (defaults to all the gold of the city)
+    """
+    stops = np.asarray(stops, dtype=np.intp)
+    golds = _stop_golds(precomputed, stops, golds)
+    path = np.concatenate(([0], stops, [0]))
+    
+    # Load after each stop: running sum of gold, reset at every depot visit
+    picked = np.concatenate(([0.0], golds, [0.0]))
+    total = np.cumsum(picked)
+    at_depot = path == 0
+    unloaded = np.maximum.accumulate(np.where(at_depot, total, 0.0))
+    load_after = total - unloaded
+    
+    froms, tos = path[:-1], path[1:]
+    keep = froms != tos  # Consecutive depot markers are not legs
+    return froms[keep], tos[keep], load_after[:-1][keep]
+
+
+def returns_cost(precomputed, stops, golds=None):
+    """Total cost of an explicit-returns tour (see returns_legs)"""
+    froms, tos, loads = returns_legs(precomputed, stops, golds)
+    return float(leg_costs(precomputed, froms, tos, loads).sum())
+
+
+def single_trip_cost(precomputed, route, golds=None):
+    """Cost of one trip depot -> route -> depot (route holds no depot visits)"""
+    route = np.asarray(route, dtype=np.intp)
+    if len(route) == 0:
+        return 0.0
+    golds = _stop_golds(precomputed, route, golds)
+    stops = np.concatenate(([0], route, [0]))
+    loads = np.concatenate(([0.0], np.cumsum(golds)))
+    return float(leg_costs(precomputed, stops[:-1], stops[1:], loads).sum())
+
+
+def returns_path_steps(precomputed, stops, golds=None):
+    """
+    Detailed [(node, gold), ...] movement of an explicit-returns tour,
+    following the precomputed shortest paths
+    """
+    stops = np.asarray(stops, dtype=np.intp)
+    golds = _stop_golds(precomputed, stops, golds).tolist()
+    steps = []
+    current = 0
+    for city, gold in zip(stops.tolist() + [0], golds + [0.0]):
+        if city == current:
+            continue
+        path = precomputed.get_path(current, city)
+        for node in path[1:]:
+            steps.append((node, gold if node == city and city != 0 else 0))
+        current = city
+    return steps
+
+
+def split_cost(precomputed, route):
+    """Split mode for one route: (cost, trip breakpoints)"""
+    V, P = split_dp(route, precomputed)
+    n = len(route)
+    return V[n], split_breaks(P, n)
+
+
+def _route_legs(route, precomputed):
+    """
+    Distances and cost factors of every leg the Split DP can use, as lists:
+    depot -> route[k], route[k] -> depot, route[k] -> route[k+1], plus gold
+    """
+    stops = np.asarray(route, dtype=np.intp)
+    D = precomputed.all_distances
+    A = precomputed.cost_factor
+    return (
+        D[0, stops].tolist(), A[0, stops].tolist(),
+        D[stops, 0].tolist(), A[stops, 0].tolist(),
+        D[stops[:-1], stops[1:]].tolist(), A[stops[:-1], stops[1:]].tolist(),
+        precomputed.gold_array[stops].tolist(),
+    )
+
+
+def split_dp(route, precomputed, parent_state=None, first_changed=0):
+    """
+    Split DP over a route. Returns (V, P) lists of length n+1:
+    V[i] = min cost to service the first i cities, P[i] = start of the last trip.
+    
+    parent_state: (V, P) of a route identical to this one before position
+        first_changed. V[0..first_changed] only depends on that common prefix,
+        so it is reused and only the rest is recomputed.
+    """
+    n = len(route)
+    
+    # V[i] = Min cost to service the first i cities in the route
+    # P[i] = Predecessor index (to reconstruct the trips)
+    if parent_state is None:
+        first_changed = 0
+        V = [0.0]
+        P = [0]
+    else:
+        first_changed = min(first_changed, n)
+        V_parent, P_parent = parent_state
+        V = list(V_parent[:first_changed + 1])
+        P = [int(p) for p in P_parent[:first_changed + 1]]
+    V += [float('inf')] * (n + 1 - len(V))
+    P += [0] * (n + 1 - len(P))
+    
+    # Trips ending after first_changed can start up to MAX_TRIP_SIZE-1 cities earlier
+    lo = max(0, first_changed + 1 - MAX_TRIP_SIZE)
+    
+    # Every leg a trip can use is either depot -> city, city -> next city in the
+    # route, or city -> depot. Gather them once with the factorized cost
+    # d + A * w^beta, so the inner loop only touches Python lists.
+    out_d, out_a, back_d, back_a, leg_d, leg_a, golds = _route_legs(route[lo:], precomputed)
+    beta = precomputed.beta
+    empty_pow = 0.0 ** beta
+    
+    for i in range(lo, n):
+        # We are at city index i (0 to n-1) in the route.
+        # This corresponds to state i in V.
+        # We try to form a trip from route[i]...route[j-1]
+        V_i = V[i]
+        
+        # 1. Travel Depot -> route[i] with an empty load
+        trip_cost = out_d[i - lo] + out_a[i - lo] * empty_pow
+        current_load = 0.0
+        
+        # Look ahead up to MAX_TRIP_SIZE cities
+        for j in range(i + 1, min(i + MAX_TRIP_SIZE, n) + 1):
+            k = j - 1 - lo
+            if j > i + 1:
+                # Travel route[j-2] -> route[j-1] with the load so far
+                trip_cost += leg_d[k - 1] + leg_a[k - 1] * load_pow
+            
+            # 2. Pick up item (w^beta is computed once per load value)
+            current_load += golds[k]
+            load_pow = current_load ** beta
+            
+            # 3. Calculate cost to return to depot IMMEDIATELY from here
+            # This closes a potential trip segment: i -> j
+            total_segment_cost = trip_cost + back_d[k] + back_a[k] * load_pow
+            
+            # 4. Update Bellman equation (V[j] up to first_changed is final)
+            if j > first_changed and V_i + total_segment_cost < V[j]:
+                V[j] = V_i + total_segment_cost
+                P[j] = i
+    
+    return V, P
+
+
+def split_dp_backward(route, precomputed, parent_U=None, last_changed=None):
+    """
+    Backward Split DP: U[i] = min cost to service route[i:] (U[n] = 0).
+    
+    parent_U: U of a route identical to this one after position last_changed;
+        U[last_changed+1..n] only depends on that common suffix and is reused.
+    """
+    n = len(route)
+    U = [float('inf')] * (n + 1)
+    U[n] = 0.0
+    start = n - 1
+    if parent_U is not None and last_changed is not None:
+        start = min(last_changed, n - 1)
+        U[start + 1:] = parent_U[start + 1:]
+    
+    out_d, out_a, back_d, back_a, leg_d, leg_a, golds = _route_legs(route, precomputed)
+    beta = precomputed.beta
+    empty_pow = 0.0 ** beta
+    
+    for i in range(start, -1, -1):
+        trip_cost = out_d[i] + out_a[i] * empty_pow
+        current_load = 0.0
+        best = U[i]
+        for j in range(i + 1, min(i + MAX_TRIP_SIZE, n) + 1):
+            if j > i + 1:
+                trip_cost += leg_d[j - 2] + leg_a[j - 2] * load_pow
+            current_load += golds[j - 1]
+            load_pow = current_load ** beta
+            total = trip_cost + back_d[j - 1] + back_a[j - 1] * load_pow + U[j]
+            if total < best:
+                best = total
+        U[i] = best
+    
+    return U
+
+
+def split_cost_between(route, precomputed, parent_V, parent_U, first_changed, last_changed):
+    """
+    Split cost of a route that differs from its parent only in positions
+    first_changed..last_changed (e.g. a 2-opt reversal).
+    
+    The parent's forward values V[0..first_changed] and backward values
+    U[last_changed+1..n] are still valid, so only trips touching the changed
+    range are evaluated: O(changed length * MAX_TRIP_SIZE) instead of O(n).
+    """
+    n = len(route)
+    stop = min(last_changed + 1, n)
+    first_changed = min(first_changed, stop)
+    
+    V = list(parent_V[:first_changed + 1]) + [float('inf')] * (stop - first_changed)
+    best = float('inf')
+    
+    # Trips starting before `stop` may run up to MAX_TRIP_SIZE cities past it
+    lo = max(0, first_changed + 1 - MAX_TRIP_SIZE)
+    hi = min(n, stop + MAX_TRIP_SIZE)
+    out_d, out_a, back_d, back_a, leg_d, leg_a, golds = _route_legs(route[lo:hi], precomputed)
+    beta = precomputed.beta
+    empty_pow = 0.0 ** beta
+    
+    for i in range(lo, stop):
+        V_i = V[i]
+        trip_cost = out_d[i - lo] + out_a[i - lo] * empty_pow
+        current_load = 0.0
+        
+        for j in range(i + 1, min(i + MAX_TRIP_SIZE, n) + 1):
+            k = j - 1 - lo
+            if j > i + 1:
+                trip_cost += leg_d[k - 1] + leg_a[k - 1] * load_pow
+            current_load += golds[k]
+            load_pow = current_load ** beta
+            total_segment_cost = trip_cost + back_d[k] + back_a[k] * load_pow
+            
+            if j <= stop:
+                # Forward values inside the changed range
+                if j > first_changed and V_i + total_segment_cost < V[j]:
+                    V[j] = V_i + total_segment_cost
+            else:
+                # Trip crossing the end of the changed range: close with the suffix
+                candidate = V_i + total_segment_cost + parent_U[j]
+                if candidate < best:
+                    best = candidate
+    
+    # Partitions with a trip boundary exactly at `stop`
+    return min(best, V[stop] + parent_U[stop])
+
+
+def split_breaks(P, n):
+    """
+    Trip breakpoints [0, b1, ..., n] from a Split predecessor array:
+    trip t serves route[breaks[t]:breaks[t+1]]
+    """
+    # We backtrack from n to 0 using P
+    breaks = [n]
+    curr = n
+    while curr > 0:
+        curr = int(P[curr])
+        breaks.append(curr)
+    breaks.reverse()
+    return tuple(breaks)
+
+
+def split_path_steps(route, trip_breaks, precomputed):
+    """
+    Rebuild the detailed [(city, gold), ...] movement of a Split result
+    from its trip breakpoints
+    """
+    stops = []
+    for a, b in zip(trip_breaks, trip_breaks[1:]):
+        stops += list(route[a:b]) + [0]
+    return returns_path_steps(precomputed, stops)
+
+
+def split_population(routes, precomputed, max_trip_size=MAX_TRIP_SIZE):
+    """
+    Split DP for a whole population at once.
+    
+    routes: 2-D integer array (num_routes x n), one permutation per row
+    Returns (V, P): (num_routes x n+1) arrays with the same values and
+    predecessors that evaluate_solution_split computes for each row.
+    """
+    routes = np.asarray(routes, dtype=np.intp)
+    m, n = routes.shape
+    V = np.full((m, n + 1), np.inf)
+    P = np.zeros((m, n + 1), dtype=np.intp)
+    V[:, 0] = 0.0
+    if n == 0:
+        return V, P
+    
+    D = precomputed.all_distances
+    A = precomputed.cost_factor
+    beta = precomputed.beta
+    K = min(max_trip_size, n)
+    
+    # Legs: depot -> route[i], route[i] -> depot, route[i] -> route[i+1]
+    out_d, out_a = D[0, routes], A[0, routes]
+    back_d, back_a = D[routes, 0], A[routes, 0]
+    leg_d = D[routes[:, :-1], routes[:, 1:]]
+    leg_a = A[routes[:, :-1], routes[:, 1:]]
+    golds = precomputed.gold_array[routes]
+    
+    # W[r, i, k-1] = cost of the trip serving route[i..i+k-1] of row r.
+    # Built one trip length at a time for all rows and start positions, with
+    # the same operation order as the scalar DP.
+    W = np.full((m, n, K), np.inf)
+    trip = out_d + out_a * (0.0 ** beta)
+    load = np.zeros((m, n))
+    load_pow = None
+    for k in range(1, K + 1):
+        starts = n - k + 1
+        trip = trip[:, :starts]
+        load = load[:, :starts]
+        if k > 1:
+            trip = trip + (leg_d[:, k - 2:k - 2 + starts] + leg_a[:, k - 2:k - 2 + starts] * load_pow[:, :starts])
+        load = load + golds[:, k - 1:k - 1 + starts]
+        load_pow = load ** beta
+        W[:, :starts, k - 1] = trip + back_d[:, k - 1:] + back_a[:, k - 1:] * load_pow
+    
+    # Bellman recurrence in lockstep over the rows. Candidates are ordered by
+    # increasing start index so argmin keeps the same tie-break as the scalar DP.
+    rows = np.arange(m)
+    for j in range(1, n + 1):
+        i_range = np.arange(max(0, j - K), j)
+        cand = V[:, i_range] + W[:, i_range, j - i_range - 1]
+        best = np.argmin(cand, axis=1)
+        V[:, j] = cand[rows, best]
+        P[:, j] = i_range[best]
+    
+    return V, P
@@ -1,11 +1,22 @@
 import math
 import random
 import networkx as nx
+import numpy as np
 from src.ga_solution import TTPSolution
 from src.ga_evaluation import evaluate_solution_split, clear_path_cache
+from src.evaluation_core import split_dp, split_dp_backward, split_cost_between
+from src.ga_batch_evaluation import evaluate_population_split, evaluate_routes
+from src.ga_fitness_cache import FitnessCache
+from src.ga_parallel import ParallelSplitEvaluator
 from src.ga_selection import tournament_selection, elitism_selection
 from src.ga_operators import order_crossover, swap_mutation, inversion_mutation, insert_mutation
+from src.ga_population import (ArrayPopulation, elite_indices, tournament_indices, order_crossover_batch,
+                               inversion_mutation_batch, swap_mutation_batch,
+                               insert_mutation_batch)
 from src.hybrid_aco.precompute import PrecomputedData
+from src.stopping import StoppingPolicy
+from src.ga_trip_moves import improve_solution_trips
+from src.ga_seeding import nearest_neighbor_routes, seed_population
 
 def genetic_algorithm(
     problem,
@@ -15,142 +26,320 @@ def genetic_algorithm(
     mutation_rate=0.2,
     tournament_size=3,
     elite_size=2,
-    verbose=True
+    verbose=True,
+    precomputed=None,
+    cache_dir=None,
+    fitness_cache=None,
+    num_workers=None,
+    migration=None,
+    representation='objects',
+    stopping=None,
+    local_search=None,
+    trip_moves=None,
+    seeding='classic'
 ) -> TTPSolution:
+    """
+    precomputed: reuse an existing PrecomputedData for this problem
+    cache_dir: persistent shortest path cache used when building one
+    fitness_cache: FitnessCache of evaluated routes (a new one when None);
+        pass your own to read its hit/miss statistics after the run
+    num_workers: evaluate each generation's offspring in a pool of this many
+        processes (opt-in); results are identical to the serial mode
+    migration: optional callable(generation, population) returning routes to
+        inject in place of the worst individuals (used by the island model).
+        With representation='array' it gets the ArrayPopulation itself, so no
+        TTPSolution objects are built on generations without migration
+    representation: 'objects' (list of TTPSolution) or 'array' (int32 route
+        matrix with the vectorized operators of ga_population)
+    stopping: optional StoppingPolicy (time budget, evaluations, patience,
+        target cost); its `reason` tells why the run ended
+    local_search: memetic improvement step with apply_2opt's signature
+        (default apply_2opt; ga_local_search.neighbor_list_search is the
+        deterministic neighbour-list alternative)
+    trip_moves: follow the memetic step with inter-trip relocate/swap/2-opt*
+        moves on the Split trips (default: only when beta > 1)
+    seeding: 'classic' (sweep, NN and perturbed sweeps) or 'mixed' (rotated
+        sweeps, multi-start NN, MST walks and savings routes, see ga_seeding)
+    """
     
+    stopping = stopping or StoppingPolicy()
+    stopping.start()
+    local_search = local_search or apply_2opt
+    if trip_moves is None:
+        trip_moves = problem.beta > 1
     clear_path_cache()
-    precomputed = PrecomputedData(problem)
-    targets = [n for n in problem.graph.nodes if n != 0]
-    
-    # --- 1. SMART INITIALIZATION ---
-    population = []
-    
-    # A. Radial "Sweep" Sort (Crucial for Depot-centric problems)
-    # Sort cities by angle around the depot (0.5, 0.5).
-    # This groups angular sectors together, perfect for the Split algorithm.
-    depot_pos = problem.graph.nodes[0]['pos']
-    def get_angle(node_idx):
-        pos = problem.graph.nodes[node_idx]['pos']
-        return math.atan2(pos[1] - depot_pos[1], pos[0] - depot_pos[0])
-    
-    sweep_route = sorted(targets, key=get_angle)
-    population.append(TTPSolution(sweep_route, problem.graph))
-    
-    # B. Nearest Neighbor Heuristic (Greedy distance)
-    curr = 0
-    nn_route = []
-    unvisited = set(targets)
-    while unvisited:
-        nxt = min(unvisited, key=lambda x: precomputed.get_distance(curr, x))
-        nn_route.append(nxt)
-        unvisited.remove(nxt)
-        curr = nxt
-    population.append(TTPSolution(nn_route, problem.graph))
-
-    # C. Random (Fill the rest)
-    while len(population) < population_size:
-        # Create a shuffled version of the sweep route to maintain some locality
-        # but introduce diversity
-        route = sweep_route[:]
+    if precomputed is None:
+        precomputed = PrecomputedData(problem, cache_dir=cache_dir)
+    if fitness_cache is None:
+        fitness_cache = FitnessCache()
+    pool = ParallelSplitEvaluator(precomputed, num_workers) if num_workers and num_workers > 1 else None
+    try:
+        targets = list(range(1, problem.num_cities))
         
-        # Heavy perturbation (swap 30% of cities)
-        for _ in range(len(route) // 3):
-            i, j = random.sample(range(len(route)), 2)
-            route[i], route[j] = route[j], route[i]
+        # --- 1. SMART INITIALIZATION ---
+        if seeding == 'mixed':
+            # Sweeps, multi-start NN, MST walks and savings routes (ga_seeding)
+            population = [TTPSolution(route, precomputed)
+                          for route in seed_population(problem, precomputed, population_size)]
+        else:
+            population = []
+            
+            # A. Radial "Sweep" Sort (Crucial for Depot-centric problems)
+            # Sort cities by angle around the depot (0.5, 0.5).
+            # This groups angular sectors together, perfect for the Split algorithm.
+            positions = problem.positions
+            depot_pos = positions[0]
+            def get_angle(node_idx):
+                pos = positions[node_idx]
+                return math.atan2(pos[1] - depot_pos[1], pos[0] - depot_pos[0])
+            
+            sweep_route = sorted(targets, key=get_angle)
+            population.append(TTPSolution(sweep_route, precomputed))
             
-        population.append(TTPSolution(route, problem.graph))
+            # B. Nearest Neighbor Heuristic (Greedy distance, masked argmin)
+            nn_route = nearest_neighbor_routes(precomputed.all_distances, [0])[0].tolist()
+            population.append(TTPSolution(nn_route, precomputed))
+
+            # C. Random (Fill the rest)
+            while len(population) < population_size:
+                # Create a shuffled version of the sweep route to maintain some locality
+                # but introduce diversity
+                route = sweep_route[:]
+                
+                # Heavy perturbation (swap 30% of cities)
+                for _ in range(len(route) // 3):
+                    i, j = random.sample(range(len(route)), 2)
+                    route[i], route[j] = route[j], route[i]
+                    
+                population.append(TTPSolution(route, precomputed))
+
+        # Evaluate Initial Pop
+        if verbose: print("Evaluating initial population...")
+        evaluate_population_split(population, problem, precomputed, fitness_cache, pool)
+        stopping.add_evaluations(len(population))
 
-    # Evaluate Initial Pop
-    if verbose: print("Evaluating initial population...")
-    for ind in population:
-        evaluate_solution_split(ind, problem, precomputed)
+        best_ever = max(population, key=lambda ind: ind.fitness)
+        if verbose: print(f"Initial best cost: {-best_ever.fitness:.2f}")
 
-    best_ever = max(population, key=lambda ind: ind.fitness)
-    if verbose: print(f"Initial best cost: {-best_ever.fitness:.2f}")
+        if representation == 'array':
+            best_ever = _evolve_array(
+                population, best_ever, problem, precomputed, generations, crossover_rate,
+                mutation_rate, tournament_size, elite_size, verbose, fitness_cache, pool, migration, stopping,
+                local_search, trip_moves)
+        else:
+            # --- 2. EVOLUTION LOOP ---
+            for generation in range(generations):
+                
+                # Elitism
+                elites = elitism_selection(population, elite_size)
+                
+                # Offspring
+                offspring = []
+                while len(offspring) < population_size - elite_size:
+                    parent1 = tournament_selection(population, tournament_size)
+                    parent2 = tournament_selection(population, tournament_size)
+                    
+                    if random.random() < crossover_rate:
+                        child = order_crossover(parent1, parent2)
+                    else:
+                        child = parent1.copy()
+                    
+                    if random.random() < mutation_rate:
+                        if random.random() < 0.6:
+                            child = inversion_mutation(child)
+                        else:
+                            child = swap_mutation(child)
+                    
+                    offspring.append(child)
+                
+                # Evaluation (whole offspring batch in one Split DP)
+                evaluate_population_split(offspring, problem, precomputed, fitness_cache, pool)
+                stopping.add_evaluations(len(offspring))
+                
+                population = elites + offspring
+                
+                # --- 3. MEMETIC LOCAL SEARCH (The Secret Sauce) ---
+                # Every 10 generations, try to strictly improve the best individual
+                # using a simple 2-opt hill climber.
+                if generation % 10 == 0:
+                    best_curr = max(population, key=lambda ind: ind.fitness)
+                    improved_sol = local_search(best_curr, problem, precomputed, max_steps=200, cache=fitness_cache,
+                                                stopping=stopping)
+                    if trip_moves:
+                        improved_sol = improve_solution_trips(improved_sol, problem, precomputed, fitness_cache,
+                                                              stopping=stopping)
+                    
+                    if improved_sol.fitness > best_ever.fitness:
+                        best_ever = improved_sol.copy()
+                        # Inject back into population to spread the good genes
+                        population[-1] = improved_sol
+                
+                # Update Global Best
+                gen_best = max(population, key=lambda ind: ind.fitness)
+                if gen_best.fitness > best_ever.fitness:
+                    best_ever = gen_best.copy()
+                    if verbose:
+                        print(f"Gen {generation}: New best cost = {-best_ever.fitness:.2f}")
+                
+                # --- 4. MIGRATION (island model) ---
+                if migration is not None:
+                    immigrants = migration(generation, population)
+                    if immigrants:
+                        # Never replace more than half of the population
+                        immigrants = immigrants[:len(population) // 2]
+                        newcomers = [TTPSolution(route, precomputed) for route in immigrants]
+                        evaluate_population_split(newcomers, problem, precomputed, fitness_cache, pool)
+                        stopping.add_evaluations(len(newcomers))
+                        population.sort(key=lambda ind: ind.fitness, reverse=True)
+                        population[-len(newcomers):] = newcomers
+                        
+                        gen_best = max(newcomers, key=lambda ind: ind.fitness)
+                        if gen_best.fitness > best_ever.fitness:
+                            best_ever = gen_best.copy()
+                
+                if stopping.should_stop(-best_ever.fitness):
+                    break
+        
+        stopping.finish()
+        if verbose:
+            print(f"\nFinal Best Cost: {-best_ever.fitness:.2f}")
+            print(stopping.summary())
+            stats = fitness_cache.stats()
+            print(f"Fitness cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.1%} of evaluations skipped)")
+        
+        return best_ever
+    finally:
+        if pool is not None:
+            pool.close()
 
-    # --- 2. EVOLUTION LOOP ---
+def _evolve_array(population, best_ever, problem, precomputed, generations, crossover_rate,
+                  mutation_rate, tournament_size, elite_size, verbose, fitness_cache, pool, migration, stopping,
+                  local_search, trip_moves):
+    """
+    Evolution loop of genetic_algorithm on an ArrayPopulation: same scheme as
+    the object loop, with every operator applied to the whole offspring batch.
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    pop = ArrayPopulation.from_solutions(population)
+    size = len(pop)
+    num_children = size - elite_size
+    
     for generation in range(generations):
         
         # Elitism
-        elites = elitism_selection(population, elite_size)
+        elites = elite_indices(pop.fitness, elite_size)
         
-        # Offspring
-        offspring = []
-        while len(offspring) < population_size - elite_size:
-            parent1 = tournament_selection(population, tournament_size)
-            parent2 = tournament_selection(population, tournament_size)
-            
-            if random.random() < crossover_rate:
-                child = order_crossover(parent1, parent2)
-            else:
-                child = parent1.copy()
-            
-            if random.random() < mutation_rate:
-                if random.random() < 0.6:
-                    child = inversion_mutation(child)
-                else:
-                    child = swap_mutation(child)
-            
-            offspring.append(child)
+        # Offspring: tournaments, OX on the rows drawn for crossover
+        parents1 = pop.routes[tournament_indices(pop.fitness, num_children, tournament_size, rng)]
+        parents2 = pop.routes[tournament_indices(pop.fitness, num_children, tournament_size, rng)]
+        children = parents1.copy()
+        crossed = rng.random(num_children) < crossover_rate
+        children[crossed] = order_crossover_batch(parents1[crossed], parents2[crossed], rng)
         
-        # Evaluation
-        for ind in offspring:
-            evaluate_solution_split(ind, problem, precomputed)
+        # Mutation: inversion 60% as in the object loop; the object loop's
+        # swap share is split between swap and insert (20% each).
+        # The operators' own 10% rate applies on top, as in the object loop
+        mutated = (rng.random(num_children) < mutation_rate) & (rng.random(num_children) < 0.1)
+        kind = rng.random(num_children)
+        inversion_mutation_batch(children, np.flatnonzero(mutated & (kind < 0.6)), rng)
+        swap_mutation_batch(children, np.flatnonzero(mutated & (kind >= 0.6) & (kind < 0.8)), rng)
+        insert_mutation_batch(children, np.flatnonzero(mutated & (kind >= 0.8)), rng)
         
-        population = elites + offspring
+        # Evaluation (whole offspring batch in one Split DP)
+        costs = evaluate_routes(children, precomputed, fitness_cache, pool)
+        stopping.add_evaluations(num_children)
+        pop = ArrayPopulation(np.concatenate([pop.routes[elites], children]),
+                              np.concatenate([pop.fitness[elites], -costs]))
         
-        # --- 3. MEMETIC LOCAL SEARCH (The Secret Sauce) ---
-        # Every 10 generations, try to strictly improve the best individual
-        # using a simple 2-opt hill climber.
+        # Memetic local search on the best row
         if generation % 10 == 0:
-            best_curr = max(population, key=lambda ind: ind.fitness)
-            improved_sol = apply_2opt(best_curr, problem, precomputed, max_steps=200)
+            best_curr = pop.to_solution(pop.best_index(), precomputed)
+            evaluate_solution_split(best_curr, problem, precomputed, fitness_cache)
+            improved_sol = local_search(best_curr, problem, precomputed, max_steps=200, cache=fitness_cache,
+                                        stopping=stopping)
+            if trip_moves:
+                improved_sol = improve_solution_trips(improved_sol, problem, precomputed, fitness_cache,
+                                                      stopping=stopping)
             
             if improved_sol.fitness > best_ever.fitness:
                 best_ever = improved_sol.copy()
-                # Inject back into population to spread the good genes
-                population[-1] = improved_sol
+                pop.routes[-1] = improved_sol.route
+                pop.fitness[-1] = improved_sol.fitness
         
         # Update Global Best
-        gen_best = max(population, key=lambda ind: ind.fitness)
-        if gen_best.fitness > best_ever.fitness:
-            best_ever = gen_best.copy()
+        b = pop.best_index()
+        if pop.fitness[b] > best_ever.fitness:
+            best_ever = pop.to_solution(b, precomputed)
+            evaluate_solution_split(best_ever, problem, precomputed, fitness_cache)
             if verbose:
                 print(f"Gen {generation}: New best cost = {-best_ever.fitness:.2f}")
-
-    if verbose:
-        print(f"\nFinal Best Cost: {-best_ever.fitness:.2f}")
+        
+        # Migration (island model)
+        if migration is not None:
+            immigrants = migration(generation, pop)
+            if immigrants:
+                immigrants = np.asarray(immigrants[:size // 2], dtype=np.int32)
+                costs = evaluate_routes(immigrants, precomputed, fitness_cache, pool)
+                stopping.add_evaluations(len(immigrants))
+                worst = np.argsort(-pop.fitness, kind='stable')[size - len(immigrants):]
+                pop.routes[worst] = immigrants
+                pop.fitness[worst] = -costs
+                
+                b = int(np.argmin(costs))
+                if -costs[b] > best_ever.fitness:
+                    best_ever = TTPSolution(immigrants[b].tolist(), precomputed)
+                    evaluate_solution_split(best_ever, problem, precomputed, fitness_cache)
+        
+        if stopping.should_stop(-best_ever.fitness):
+            break
     
     return best_ever
 
-def apply_2opt(solution, problem, precomputed, max_steps=100):
+def apply_2opt(solution, problem, precomputed, max_steps=100, cache=None, stopping=None):
     """
     Simple stochastic 2-opt local search.
     Tries to untangle crossing paths to improve the sequence for the Split algorithm.
+    Probes only re-run the Split DP on trips touching the reversed segment, using
+    the forward/backward DP values of the current route around it.
+    stopping: optional StoppingPolicy; every probe and accepted move counts as
+        one evaluation
     """
-    route = solution.route[:]
-    best_fitness = solution.fitness
-    improved = False
+    best = solution
+    if best.split_state is None:
+        best.split_state = split_dp(best.route, precomputed)
+    U = split_dp_backward(best.route, precomputed)
     
     # Try random swaps
     for _ in range(max_steps):
+        route = best.route
         i, j = sorted(random.sample(range(len(route)), 2))
         if i == 0 or j == len(route)-1: continue 
         
         # 2-Opt Swap (Reverse segment)
         new_route = route[:i] + route[i:j+1][::-1] + route[j+1:]
         
-        # Fast check: Just check fitness
-        temp_sol = TTPSolution(new_route, problem.graph)
-        fit = evaluate_solution_split(temp_sol, problem, precomputed)
+        # Fast check: Just check fitness (peek: probes must not skew the cache stats)
+        entry = cache.peek(new_route) if cache is not None else None
+        if entry is not None:
+            cost = entry[0]
+        else:
+            cost = split_cost_between(new_route, precomputed, best.split_state[0], U, i, j)
+            if stopping is not None:
+                stopping.add_evaluations()
         
-        if fit > best_fitness:
-            route = new_route
-            best_fitness = fit
-            improved = True
+        # Relative tolerance: probe costs sum in a different order than split_dp
+        if cost < best.cost - 1e-9 * abs(best.cost):
+            # Full evaluation only for accepted moves, reusing the DP prefix up to i
+            temp_sol = TTPSolution(new_route, precomputed)
+            temp_sol.split_state = best.split_state
+            temp_sol.dirty_from = i
+            evaluate_solution_split(temp_sol, problem, precomputed, cache)
+            if stopping is not None:
+                stopping.add_evaluations()
+            if temp_sol.split_state is None:
+                temp_sol.split_state = split_dp(new_route, precomputed)
+            U = split_dp_backward(new_route, precomputed, U, j)
+            best = temp_sol
     
-    if improved:
-        sol = TTPSolution(route, problem.graph)
-        evaluate_solution_split(sol, problem, precomputed)
-        return sol
-    return solution
\ No newline at end of file
+    return best
@@ -0,0 +1,98 @@
+import numpy as np
+from src.evaluation_core import split_breaks, split_population
+
+
+def evaluate_population_split(population, problem, precomputed, cache=None, pool=None):
+    """
+    Batched evaluate_solution_split for a list of TTPSolution.
+    Only individuals without a fitness are evaluated; with a FitnessCache,
+    known routes are answered from it and duplicates in the batch run once.
+    pool: optional ParallelSplitEvaluator running the DP in worker processes
+    """
+    pending = [ind for ind in population if ind.fitness is None]
+    if not pending:
+        return
+    
+    if cache is None:
+        groups = [[ind] for ind in pending]
+        keys = [None] * len(groups)
+    else:
+        by_key = {}
+        for ind in pending:
+            key = cache.key(ind.route)
+            if key in by_key:
+                by_key[key].append(ind)
+                cache.hits += 1
+                continue
+            entry = cache.get(ind.route, key)
+            if entry is not None:
+                _assign(ind, entry[0], entry[1], precomputed)
+            else:
+                by_key[key] = [ind]
+        groups = list(by_key.values())
+        keys = list(by_key.keys())
+    if not groups:
+        return
+    
+    routes = [group[0].route for group in groups]
+    if pool is not None:
+        V, P = pool.split_population(routes)
+    else:
+        V, P = split_population(routes, precomputed)
+    n = V.shape[1] - 1
+    for group, key, values, preds in zip(groups, keys, V, P):
+        cost = float(values[n])
+        trip_breaks = split_breaks(preds, n)
+        for ind in group:
+            _assign(ind, cost, trip_breaks, precomputed, (values, preds))
+        if cache is not None:
+            cache.put(group[0].route, cost, trip_breaks, key)
+
+
+def _assign(individual, cost, trip_breaks, precomputed, split_state=None):
+    individual.cost = cost
+    individual.fitness = -cost
+    individual.set_trips(trip_breaks, precomputed)
+    individual.split_state = split_state
+    individual.dirty_from = None
+
+
+def evaluate_routes(routes, precomputed, cache=None, pool=None):
+    """
+    Split costs of the rows of a route matrix (array population mode).
+    Same cache and in-batch deduplication as evaluate_population_split.
+    """
+    routes = np.ascontiguousarray(routes, dtype=np.int32)
+    costs = np.empty(len(routes))
+    if cache is None:
+        todo = {i: [i] for i in range(len(routes))}
+    else:
+        todo = {}
+        by_key = {}
+        for i, row in enumerate(routes):
+            key = row.tobytes()
+            if key in by_key:
+                todo[by_key[key]].append(i)
+                cache.hits += 1
+                continue
+            entry = cache.get(row, key)
+            if entry is not None:
+                costs[i] = entry[0]
+            else:
+                by_key[key] = i
+                todo[i] = [i]
+    if not todo:
+        return costs
+    
+    first = list(todo)
+    if pool is not None:
+        V, P = pool.split_population(routes[first])
+    else:
+        V, P = split_population(routes[first], precomputed)
+    n = V.shape[1] - 1
+    costs_first = V[:, n]
+    for i, cost, preds in zip(first, costs_first.tolist(), P):
+        costs[todo[i]] = cost
+        if cache is not None:
+            cache.put(routes[i], cost, split_breaks(preds, n), routes[i].tobytes())
+    return costs
@@ -1,11 +1,12 @@
 import networkx as nx
 from Problem import Problem
 from src.ga_solution import TTPSolution
-import math
+from src.evaluation_core import split_dp, split_breaks
 
 # Cache for shortest paths
 _path_cache = {}
 
+
 def clear_path_cache():
     """Clear the cache when problem changes"""
     global _path_cache
@@ -102,10 +103,15 @@ def evaluate_solution(individual: TTPSolution, problem: Problem):
     return individual.fitness
 
 
-def evaluate_solution_split(individual, problem, precomputed):
+def evaluate_solution_split(individual, problem, precomputed, cache=None):
     """
     Evaluates a permutation using the Split algorithm (DP).
     Finds the optimal segmentation of the tour into multiple trips.
+    cache: optional FitnessCache consulted before running the DP
+    
+    If the individual carries its parent's DP state (split_state) and the first
+    position its route differs from it (dirty_from), only the DP values from
+    that position on are recomputed.
     """
     if individual.fitness is not None:
         return individual.fitness
@@ -113,83 +119,29 @@ def evaluate_solution_split(individual, problem, precomputed):
     route = individual.route
     n = len(route)
     
-    # V[i] = Min cost to service the first i cities in the route
-    # P[i] = Predecessor index (to reconstruct the trips)
-    V = [float('inf')] * (n + 1)
-    P = [0] * (n + 1)
-    V[0] = 0
-    
-    # CONSTRAINT: For Beta > 1, trips are short. 
-    # Limit search to 15 cities max per trip to speed up GA (O(N) instead of O(N^2))
-    MAX_TRIP_SIZE = 15
+    if cache is not None:
+        key = cache.key(route)
+        entry = cache.get(route, key)
+        if entry is not None:
+            individual.cost = entry[0]
+            individual.fitness = -entry[0]
+            individual.set_trips(entry[1], precomputed)
+            # The cache has no DP state for this route
+            individual.split_state = None
+            individual.dirty_from = None
+            return individual.fitness
     
-    for i in range(n):
-        # We are at city index i (0 to n-1) in the route.
-        # This corresponds to state i in V.
-        # We try to form a trip from route[i]...route[j-1]
-        
-        current_load = 0
-        trip_cost = 0
-        prev_node = 0 # Start at Depot
-        
-        # Look ahead up to MAX_TRIP_SIZE cities
-        for k in range(1, MAX_TRIP_SIZE + 1):
-            j = i + k
-            if j > n: 
-                break
-            
-            city = route[j-1]
-            
-            # 1. Travel from prev_node -> city
-            dist_leg = precomputed.get_distance(prev_node, city)
-            trip_cost += precomputed.calculate_cost(prev_node, city, current_load)
-            
-            # 2. Pick up item
-            current_load += precomputed.get_gold(city)
-            prev_node = city
-            
-            # 3. Calculate cost to return to depot IMMEDIATELY from here
-            # This closes a potential trip segment: i -> j
-            return_cost = precomputed.calculate_cost(city, 0, current_load)
-            
-            total_segment_cost = trip_cost + return_cost
-            
-            # 4. Update Bellman equation
-            if V[i] + total_segment_cost < V[j]:
-                V[j] = V[i] + total_segment_cost
-                P[j] = i
+    if individual.dirty_from is not None and individual.split_state is not None:
+        V, P = split_dp(route, precomputed, individual.split_state, individual.dirty_from)
+    else:
+        V, P = split_dp(route, precomputed)
 
-    # Reconstruct the path steps
+    # Only the trip breakpoints are stored, path_steps is decoded on demand
     individual.cost = V[n]
     individual.fitness = -V[n]
-    
-    # Reconstruct the actual movement (for visualization/debugging)
-    # We backtrack from n to 0 using P
-    trips = []
-    curr = n
-    while curr > 0:
-        prev = P[curr]
-        # Trip was from prev to curr (indices in route are prev..curr-1)
-        trips.append(route[prev:curr])
-        curr = prev
-    trips.reverse()
-    
-    # Build detailed path_steps
-    full_steps = []
-    for trip in trips:
-        curr_node = 0
-        for city in trip:
-            # Add intermediate steps from shortest path cache
-            path = precomputed.get_path(curr_node, city)
-            for node in path[1:]:
-                g = precomputed.get_gold(node) if node == city else 0
-                full_steps.append((node, g))
-            curr_node = city
-        
-        # Return to depot
-        path_home = precomputed.get_path(curr_node, 0)
-        for node in path_home[1:]:
-            full_steps.append((node, 0))
-            
-    individual.path_steps = full_steps
-    return individual.fitness
\ No newline at end of file
+    individual.set_trips(split_breaks(P, n), precomputed)
+    individual.split_state = (V, P)
+    individual.dirty_from = None
+    if cache is not None:
+        cache.put(route, individual.cost, individual.trip_breaks, key)
+    return individual.fitness
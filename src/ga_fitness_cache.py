@@ -0,0 +1,68 @@
+from array import array
+from collections import OrderedDict
+
+
+class FitnessCache:
+    """
+    Bounded route -> Split result table (LRU eviction).
+    Lets the GA skip the DP for routes it has already evaluated.
+    """
+    def __init__(self, max_size=20000):
+        """
+        max_size: maximum number of routes kept (0 disables the cache)
+        """
+        self.max_size = max_size
+        self._table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(route):
+        """Compact byte key of a route (exact, no collisions)"""
+        if isinstance(route, array) and route.typecode == 'i':
+            return route.tobytes()
+        return array('i', route).tobytes()
+    
+    def get(self, route, key=None):
+        """Return (cost, trip_breaks) for a known route, or None"""
+        key = self.key(route) if key is None else key
+        entry = self._table.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        self._table.move_to_end(key)
+        return entry
+    
+    def peek(self, route, key=None):
+        """
+        Like get, but leaves the hit/miss counters and the LRU order alone:
+        for speculative probes that fall back to a cheap estimate on a miss
+        """
+        key = self.key(route) if key is None else key
+        return self._table.get(key)
+    
+    def put(self, route, cost, trip_breaks, key=None):
+        """Store a Split result, evicting the least recently used entries"""
+        if self.max_size <= 0:
+            return
+        
+        key = self.key(route) if key is None else key
+        self._table[key] = (cost, trip_breaks)
+        self._table.move_to_end(key)
+        while len(self._table) > self.max_size:
+            self._table.popitem(last=False)
+    
+    def stats(self):
+        """Hit/miss counters, e.g. to report how many DP runs were saved"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._table),
+        }
+    
+    def __len__(self):
+        return len(self._table)
@@ -0,0 +1,236 @@
+import queue
+import random
+import threading
+import time
+import numpy as np
+from multiprocessing import get_context
+from multiprocessing.connection import Listener, Client
+from src.ga_algorithm import genetic_algorithm
+from src.ga_evaluation import evaluate_solution_split
+from src.ga_population import ArrayPopulation
+from src.ga_solution import TTPSolution
+from src.hybrid_aco.precompute import PrecomputedData
+
+
+def build_topology(num_islands, topology='ring'):
+    """
+    Directed migration edges (src, dst) between islands.
+    topology: 'ring', 'complete', or an explicit list of (src, dst) pairs
+    """
+    if topology == 'ring':
+        return [(i, (i + 1) % num_islands) for i in range(num_islands)] if num_islands > 1 else []
+    if topology == 'complete':
+        return [(i, j) for i in range(num_islands) for j in range(num_islands) if i != j]
+    return [tuple(edge) for edge in topology]
+
+
+class IslandLinks:
+    """
+    Connections of one island: outgoing migrants are sent by a background
+    thread (a full pipe never blocks the GA), incoming ones are drained
+    without waiting.
+    """
+    def __init__(self, out_conns, in_conns):
+        self.out_conns = list(out_conns)
+        self.in_conns = list(in_conns)
+        self._outbox = queue.Queue()
+        self._sender = threading.Thread(target=self._send_loop, daemon=True)
+        self._sender.start()
+    
+    def _send_loop(self):
+        while True:
+            message = self._outbox.get()
+            for conn in self.out_conns:
+                try:
+                    conn.send(message)
+                except (OSError, EOFError):
+                    pass  # Neighbour already finished
+    
+    def send(self, routes):
+        self._outbox.put(routes)
+    
+    def receive(self):
+        """All migrant batches received since the last call"""
+        received = []
+        for conn in list(self.in_conns):
+            try:
+                while conn.poll():
+                    received.append(conn.recv())
+            except (OSError, EOFError):
+                self.in_conns.remove(conn)
+        return received
+
+
+class PipeTransport:
+    """
+    Default transport: one-way multiprocessing pipes between local processes
+    """
+    def prepare(self, num_islands, edges):
+        """Per-island link specs, created in the master process"""
+        specs = [{'out': [], 'in': []} for _ in range(num_islands)]
+        for src, dst in edges:
+            recv_end, send_end = get_context().Pipe(duplex=False)
+            specs[src]['out'].append(send_end)
+            specs[dst]['in'].append(recv_end)
+        return specs
+    
+    def connect(self, spec):
+        """Called inside the island process"""
+        return IslandLinks(spec['out'], spec['in'])
+
+
+class SocketTransport:
+    """
+    TCP transport (multiprocessing.connection). Every island listens on
+    base_port + island_id, so islands can later live on different hosts.
+    """
+    def __init__(self, host='localhost', base_port=6100, authkey=b'ttp-islands', hosts=None, timeout=30.0):
+        """
+        hosts: optional list of host names per island (defaults to `host`)
+        """
+        self.host = host
+        self.base_port = base_port
+        self.authkey = authkey
+        self.hosts = hosts
+        self.timeout = timeout
+    
+    def _address(self, island):
+        host = self.hosts[island] if self.hosts else self.host
+        return (host, self.base_port + island)
+    
+    def prepare(self, num_islands, edges):
+        specs = [{'id': i, 'out': [], 'num_in': 0} for i in range(num_islands)]
+        for src, dst in edges:
+            specs[src]['out'].append(self._address(dst))
+            specs[dst]['num_in'] += 1
+        return specs
+    
+    def connect(self, spec):
+        listener = Listener(self._address(spec['id']), authkey=self.authkey)
+        in_conns = []
+        
+        def accept_all():
+            for _ in range(spec['num_in']):
+                in_conns.append(listener.accept())
+        
+        acceptor = threading.Thread(target=accept_all, daemon=True)
+        acceptor.start()
+        
+        # Neighbours may not be listening yet: retry until the timeout
+        out_conns = []
+        deadline = time.time() + self.timeout
+        for address in spec['out']:
+            while True:
+                try:
+                    out_conns.append(Client(address, authkey=self.authkey))
+                    break
+                except ConnectionRefusedError:
+                    if time.time() > deadline:
+                        raise
+                    time.sleep(0.05)
+        
+        acceptor.join(max(deadline - time.time(), 0.0))
+        listener.close()
+        if acceptor.is_alive() or len(in_conns) < spec['num_in']:
+            # A partial topology would silently starve this island of migrants
+            for conn in out_conns + in_conns:
+                conn.close()
+            raise TimeoutError(f"Island {spec['id']}: only {len(in_conns)} of {spec['num_in']} "
+                               f"neighbours connected within {self.timeout}s")
+        return IslandLinks(out_conns, in_conns)
+
+
+def _run_island(island_id, problem, transport, link_spec, seed, migration_interval,
+                num_migrants, precomputed, cache_dir, ga_kwargs, result_conn):
+    """Body of one island process"""
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+    links = transport.connect(link_spec)
+    
+    def migrate(generation, population):
+        if (generation + 1) % migration_interval:
+            return None
+        
+        if isinstance(population, ArrayPopulation):
+            best = np.argsort(-population.fitness, kind='stable')[:num_migrants]
+            links.send(population.routes[best])
+        else:
+            best = sorted(population, key=lambda ind: ind.fitness, reverse=True)[:num_migrants]
+            links.send(np.array([ind.route for ind in best], dtype=np.int32))
+        
+        immigrants = []
+        for batch in links.receive():
+            immigrants.extend(batch.tolist())
+        return immigrants
+    
+    best = genetic_algorithm(problem, verbose=False, precomputed=precomputed, cache_dir=cache_dir,
+                             migration=migrate, **ga_kwargs)
+    result_conn.send((island_id, best.cost, list(best.route)))
+    result_conn.close()
+
+
+def island_genetic_algorithm(
+    problem,
+    num_islands=4,
+    migration_interval=10,
+    num_migrants=2,
+    topology='ring',
+    transport=None,
+    cache_dir=None,
+    verbose=True,
+    **ga_kwargs
+) -> TTPSolution:
+    """
+    Island-model GA: num_islands independent genetic_algorithm populations in
+    separate processes. Every migration_interval generations each island sends
+    its num_migrants best routes along the topology edges, and receives the ones
+    that arrived for it (migration is asynchronous, islands never wait).
+    
+    transport: PipeTransport() (default) or SocketTransport(...)
+    ga_kwargs: forwarded to genetic_algorithm (population_size, generations, ...)
+    """
+    transport = transport or PipeTransport()
+    edges = build_topology(num_islands, topology)
+    link_specs = transport.prepare(num_islands, edges)
+    
+    # Shared precomputation: with cache_dir the islands memory-map its result,
+    # otherwise the matrices are handed to them directly
+    precomputed = PrecomputedData(problem, cache_dir=cache_dir)
+    island_precomputed = None if cache_dir else precomputed
+    
+    if verbose:
+        print(f"Island GA: {num_islands} islands, {len(edges)} migration links, "
+              f"every {migration_interval} generations")
+    
+    ctx = get_context()
+    result_recv, result_send = ctx.Pipe(duplex=False)
+    processes = []
+    for island_id in range(num_islands):
+        proc = ctx.Process(
+            target=_run_island,
+            args=(island_id, problem, transport, link_specs[island_id], random.getrandbits(32),
+                  migration_interval, num_migrants, island_precomputed, cache_dir, ga_kwargs, result_send),
+        )
+        proc.start()
+        processes.append(proc)
+    
+    results = []
+    while len(results) < num_islands:
+        if result_recv.poll(1.0):
+            results.append(result_recv.recv())
+        elif any(proc.exitcode not in (None, 0) for proc in processes):
+            for proc in processes:
+                proc.terminate()
+            raise RuntimeError("An island process failed before reporting its result")
+    for proc in processes:
+        proc.join()
+    
+    island_id, cost, route = min(results, key=lambda r: r[1])
+    if verbose:
+        for i, c, _ in sorted(results):
+            print(f"Island {i}: best cost = {c:.2f}")
+        print(f"\nFinal Best Cost: {cost:.2f} (island {island_id})")
+    
+    best = TTPSolution(route, precomputed)
+    evaluate_solution_split(best, problem, precomputed)
+    return best
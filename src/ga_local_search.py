@@ -0,0 +1,146 @@
+from collections import deque
+from src.ga_solution import TTPSolution
+from src.ga_evaluation import evaluate_solution_split
+from src.evaluation_core import split_dp, split_dp_backward, split_cost_between
+
+
+def neighbor_list_search(solution, problem, precomputed, max_steps=200, cache=None,
+                         k=8, or_opt_lengths=(1, 2, 3), max_span=30, stopping=None):
+    """
+    Deterministic first-improvement local search on the GA route.
+    Drop-in replacement for apply_2opt (pass it as genetic_algorithm's local_search).
+
+    Candidate moves come from the k nearest neighbours of each city:
+    - 2-opt: reverse the route segment that makes a city adjacent to a neighbour
+    - Or-opt: move a segment of 1-3 cities (optionally reversed) next to a neighbour
+    Moves that shorten the tour (depot at both ends) are priced with the Split
+    DP (split_cost_between), so a move is kept only if it lowers the real
+    multi-trip cost. Don't-look bits skip cities whose neighbourhood did not
+    change since they last failed to improve.
+
+    max_steps: maximum number of improving moves applied
+    max_span: longest route range a single move may change (bounds probe cost)
+    stopping: optional StoppingPolicy; every Split probe and accepted move
+        counts as one evaluation
+    """
+    best = solution
+    route = best.route
+    n = len(route)
+    if n < 3:
+        return best
+
+    if best.fitness is None:
+        evaluate_solution_split(best, problem, precomputed, cache)
+    if best.split_state is None:
+        best.split_state = split_dp(route, precomputed)
+    U = split_dp_backward(route, precomputed)
+
+    neighbors = precomputed.nearest_neighbors(k).tolist()
+    position = [0] * precomputed.num_cities
+    for idx, city in enumerate(route):
+        position[city] = idx
+
+    # Active cities (don't-look bit off), processed in route order first
+    active = deque(route)
+    queued = set(route)
+    steps = 0
+
+    while active and steps < max_steps:
+        city = active.popleft()
+        queued.discard(city)
+
+        move, probes = _first_improving_move(best, city, neighbors[city], position, U, precomputed,
+                                             or_opt_lengths, max_span)
+        if stopping is not None:
+            stopping.add_evaluations(probes + (move is not None))
+        if move is None:
+            continue  # Don't-look bit stays on until a neighbour changes
+
+        new_route, lo, hi = move
+        temp_sol = TTPSolution(new_route, precomputed)
+        temp_sol.split_state = best.split_state
+        temp_sol.dirty_from = lo
+        evaluate_solution_split(temp_sol, problem, precomputed, cache)
+        if temp_sol.split_state is None:
+            temp_sol.split_state = split_dp(new_route, precomputed)
+        U = split_dp_backward(new_route, precomputed, U, hi)
+        best = temp_sol
+        steps += 1
+
+        # Reset the don't-look bits around the changed range
+        for idx in range(lo, hi + 1):
+            position[new_route[idx]] = idx
+        for idx in (lo - 1, lo, hi, hi + 1, position[city]):
+            if 0 <= idx < n and new_route[idx] not in queued:
+                active.append(new_route[idx])
+                queued.add(new_route[idx])
+
+    return best
+
+
+def _first_improving_move(solution, city, city_neighbors, position, U, precomputed,
+                          or_opt_lengths, max_span):
+    """
+    First (new_route, lo, hi) among city's candidate moves that lowers the
+    cost (or None), and the number of moves priced with the Split DP
+    """
+    route = solution.route
+    n = len(route)
+    V = solution.split_state[0]
+    current = solution.cost - 1e-9 * abs(solution.cost)
+    D = precomputed.all_distances
+    i = position[city]
+    probes = 0
+
+    def at(idx):
+        # Route as a closed tour through the depot
+        return route[idx] if 0 <= idx < n else 0
+
+    # Neighbour-list pruning: a new edge longer than both current ones can not help
+    radius = max(D[city, at(i - 1)], D[city, at(i + 1)])
+
+    # Moves are priced with the Split DP only if they shorten the tour itself
+    # (cheap gain check on the edges they change), which discards most probes
+    for other in city_neighbors:
+        if D[city, other] >= radius:
+            break
+        j = position[other]
+
+        # 2-opt: make `other` follow `city` (or precede it) by reversing the gap
+        if i + 1 < j <= i + max_span:
+            lo, hi = i + 1, j
+        elif i - max_span <= j < i - 1:
+            lo, hi = j, i - 1
+        else:
+            lo = None
+        if lo is not None:
+            a, b, c, d = at(lo - 1), route[lo], route[hi], at(hi + 1)
+            if D[a, c] + D[b, d] < D[a, b] + D[c, d]:
+                new_route = route[:lo] + route[lo:hi + 1][::-1] + route[hi + 1:]
+                probes += 1
+                if split_cost_between(new_route, precomputed, V, U, lo, hi) < current:
+                    return (new_route, lo, hi), probes
+
+        # Or-opt: move route[i:i+length] right after `other`, as is or reversed
+        for length in or_opt_lengths:
+            end = i + length
+            if end > n or i <= j < end or abs(j - i) > max_span:
+                continue
+            first, last = route[i], route[end - 1]
+            removed = D[at(i - 1), first] + D[last, at(end)] - D[at(i - 1), at(end)]
+            x, y = other, at(j + 1)
+            segment = route[i:end]
+            for seg, head, tail in ((segment, first, last), (segment[::-1], last, first)):
+                if D[x, head] + D[tail, y] - D[x, y] >= removed:
+                    continue
+                if j < i:
+                    lo, hi = j + 1, end - 1
+                    new_route = route[:lo] + seg + route[lo:i] + route[end:]
+                else:
+                    lo, hi = i, j
+                    new_route = route[:i] + route[end:j + 1] + seg + route[j + 1:]
+                probes += 1
+                if split_cost_between(new_route, precomputed, V, U, lo, hi) < current:
+                    return (new_route, lo, hi), probes
+
+    return None, probes
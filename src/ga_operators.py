@@ -1,5 +1,4 @@
 import random
-import copy
 from src.ga_solution import TTPSolution
 
 def order_crossover(parent1: TTPSolution, parent2: TTPSolution) -> TTPSolution:
@@ -19,15 +18,16 @@ def order_crossover(parent1: TTPSolution, parent2: TTPSolution) -> TTPSolution:
     child_route[cx_point1:cx_point2] = route1[cx_point1:cx_point2]
     
     # Fill remaining positions with cities from parent2 (in order)
+    in_child = set(route1[cx_point1:cx_point2])
     pointer = cx_point2
     for city in route2[cx_point2:] + route2[:cx_point2]:
-        if city not in child_route:
+        if city not in in_child:
             if pointer >= size:
                 pointer = 0
             child_route[pointer] = city
             pointer += 1
     
-    return TTPSolution(child_route, parent1.graph)
+    return TTPSolution(child_route, parent1.context)
 
 def swap_mutation(individual: TTPSolution, mutation_rate: float = 0.1) -> TTPSolution:
     """
@@ -45,9 +45,8 @@ def swap_mutation(individual: TTPSolution, mutation_rate: float = 0.1) -> TTPSol
     i, j = random.sample(range(len(mutant.route)), 2)
     mutant.route[i], mutant.route[j] = mutant.route[j], mutant.route[i]
     
-    # Invalidate fitness
-    mutant.fitness = None
-    mutant.cost = None
+    # Invalidate fitness (the route is unchanged before min(i, j))
+    mutant.mark_changed(min(i, j))
     
     return mutant
 
@@ -65,10 +64,9 @@ def inversion_mutation(individual: TTPSolution, mutation_rate: float = 0.1) -> T
         return mutant
     
     i, j = sorted(random.sample(range(len(mutant.route)), 2))
-    mutant.route[i:j+1] = reversed(mutant.route[i:j+1])
+    mutant.route[i:j+1] = mutant.route[i:j+1][::-1]
     
-    mutant.fitness = None
-    mutant.cost = None
+    mutant.mark_changed(i)
     
     return mutant
 
@@ -91,7 +89,6 @@ def insert_mutation(individual: TTPSolution, mutation_rate: float = 0.1) -> TTPS
     j = random.randint(0, len(mutant.route))
     mutant.route.insert(j, city)
     
-    mutant.fitness = None
-    mutant.cost = None
+    mutant.mark_changed(min(i, j))
     
     return mutant
\ No newline at end of file
@@ -0,0 +1,66 @@
+import numpy as np
+from multiprocessing import get_context
+from src.evaluation_core import split_population
+from src.shared_arrays import SharedArrays, attach_shared_arrays
+
+
+class _WorkerInstance:
+    """
+    The parts of PrecomputedData the batched Split needs, backed by shared memory
+    """
+    def __init__(self, spec, beta):
+        arrays, self._blocks = attach_shared_arrays(spec)
+        self.all_distances = arrays['all_distances']
+        self.cost_factor = arrays['cost_factor']
+        self.gold_array = arrays['gold_array']
+        self.beta = beta
+
+
+_worker_instance = None
+
+def _init_worker(spec, beta):
+    global _worker_instance
+    _worker_instance = _WorkerInstance(spec, beta)
+
+
+def _split_chunk(routes):
+    V, P = split_population(routes, _worker_instance)
+    return V, P.astype(np.int32)
+
+
+class ParallelSplitEvaluator:
+    """
+    Process pool running the batched Split DP on chunks of a population.
+    Distances, cost factors and gold live in shared memory, so tasks only
+    carry int32 routes and return the DP arrays.
+    """
+    def __init__(self, precomputed, num_workers):
+        self.num_workers = num_workers
+        self.shared = SharedArrays({
+            'all_distances': precomputed.all_distances,
+            'cost_factor': precomputed.cost_factor,
+            'gold_array': precomputed.gold_array,
+        })
+        self.pool = get_context().Pool(
+            num_workers, initializer=_init_worker, initargs=(self.shared.spec, precomputed.beta)
+        )
+    
+    def split_population(self, routes):
+        """Same result as ga_batch_evaluation.split_population, computed by the pool"""
+        routes = np.asarray(routes, dtype=np.int32)
+        chunks = [c for c in np.array_split(routes, self.num_workers) if len(c)]
+        results = self.pool.map(_split_chunk, chunks)
+        V = np.concatenate([r[0] for r in results])
+        P = np.concatenate([r[1] for r in results]).astype(np.intp)
+        return V, P
+    
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.shared.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
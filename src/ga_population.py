@@ -0,0 +1,129 @@
+from array import array
+import numpy as np
+from src.ga_solution import TTPSolution
+
+
+class ArrayPopulation:
+    """
+    Population stored as an int32 route matrix (one permutation per row)
+    and a float fitness vector, for the vectorized GA operators below.
+    """
+    def __init__(self, routes, fitness=None):
+        self.routes = np.ascontiguousarray(routes, dtype=np.int32)
+        if fitness is None:
+            fitness = np.full(len(self.routes), -np.inf)
+        self.fitness = np.asarray(fitness, dtype=float)
+
+    @classmethod
+    def from_solutions(cls, solutions):
+        """Build from evaluated TTPSolution objects"""
+        return cls([sol.route for sol in solutions], [sol.fitness for sol in solutions])
+
+    def __len__(self):
+        return len(self.routes)
+
+    def best_index(self):
+        return int(np.argmax(self.fitness))
+
+    def to_solution(self, index, context):
+        """Row `index` as an (unevaluated) TTPSolution"""
+        return TTPSolution(array('i', self.routes[index].tobytes()), context)
+
+
+def elite_indices(fitness, elite_size):
+    """Indices of the elite_size best individuals, best first (argpartition)"""
+    elite_size = min(elite_size, len(fitness))
+    if elite_size <= 0:
+        return np.empty(0, dtype=np.intp)
+    top = np.argpartition(-fitness, elite_size - 1)[:elite_size]
+    return top[np.argsort(-fitness[top], kind='stable')]
+
+
+def tournament_indices(fitness, count, tournament_size, rng):
+    """
+    count tournament winners at once: every row of a (count x tournament_size)
+    matrix of distinct random contestants is reduced with argmax
+    """
+    size = len(fitness)
+    tournament_size = min(tournament_size, size)
+    # Distinct contestants per tournament: the first columns of a random permutation
+    contestants = np.argpartition(rng.random((count, size)), tournament_size - 1, axis=1)[:, :tournament_size]
+    winners = np.argmax(fitness[contestants], axis=1)
+    return contestants[np.arange(count), winners]
+
+
+def order_crossover_batch(parents1, parents2, rng):
+    """
+    Order Crossover (OX) on whole parent matrices.
+    Each child keeps parent1[c1:c2] and fills the other positions, starting
+    at c2 and wrapping, with the remaining cities in parent2 order from c2.
+    """
+    m, size = parents1.shape
+    if m == 0 or size < 2:
+        return parents1.copy()
+
+    # Two distinct cut points per row, like random.sample(range(size), 2)
+    c1, c2 = _random_pairs(m, size, rng)
+    c1, c2 = c1[:, None], c2[:, None]
+    rows = np.arange(m)[:, None]
+
+    # Cities of the copied segment, marked in a (m x num_cities) table
+    positions = np.arange(size)
+    in_segment = (positions >= c1) & (positions < c2)
+    taken = np.zeros((m, int(max(parents1.max(), parents2.max())) + 1), dtype=bool)
+    taken[np.broadcast_to(rows, parents1.shape)[in_segment], parents1[in_segment]] = True
+
+    # Everything in "rotated" order starting at c2
+    rotated = (c2 + positions) % size
+    donor = parents2[rows, rotated]
+    keep = ~taken[rows, donor]
+    free = ~in_segment[rows, rotated]
+
+    # Row-major boolean fill: each row has as many kept cities as free slots
+    child_rotated = parents1[rows, rotated]
+    child_rotated[free] = donor[keep]
+
+    children = np.empty_like(parents1)
+    children[rows, rotated] = child_rotated
+    return children
+
+
+def _random_pairs(count, size, rng):
+    """count pairs of distinct positions (i < j)"""
+    i = rng.integers(0, size, count)
+    j = rng.integers(0, size - 1, count)
+    j += j >= i
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def inversion_mutation_batch(routes, rows, rng):
+    """Reverse a random segment [i, j] in each of the given rows (in place)"""
+    if len(rows) == 0 or routes.shape[1] < 2:
+        return
+    i, j = _random_pairs(len(rows), routes.shape[1], rng)
+    positions = np.arange(routes.shape[1])
+    inside = (positions >= i[:, None]) & (positions <= j[:, None])
+    source = np.where(inside, i[:, None] + j[:, None] - positions, positions)
+    routes[rows] = np.take_along_axis(routes[rows], source, axis=1)
+
+
+def swap_mutation_batch(routes, rows, rng):
+    """Swap two random cities in each of the given rows (in place)"""
+    if len(rows) == 0 or routes.shape[1] < 2:
+        return
+    i, j = _random_pairs(len(rows), routes.shape[1], rng)
+    routes[rows, i], routes[rows, j] = routes[rows, j], routes[rows, i]
+
+
+def insert_mutation_batch(routes, rows, rng):
+    """Move a random city to another random position in each of the given rows (in place)"""
+    size = routes.shape[1]
+    if len(rows) == 0 or size < 2:
+        return
+    src = rng.integers(0, size, len(rows))[:, None]
+    dst = rng.integers(0, size, len(rows))[:, None]
+    positions = np.arange(size)
+    # Positions between src and dst shift by one towards src
+    source = positions + ((positions >= src) & (positions < dst)) - ((positions <= src) & (positions > dst))
+    source = np.where(positions == dst, src, source)
+    routes[rows] = np.take_along_axis(routes[rows], source, axis=1)
@@ -0,0 +1,222 @@
+import random
+import numpy as np
+from src.evaluation_core import MAX_TRIP_SIZE
+
+try:
+    from scipy.sparse.csgraph import minimum_spanning_tree
+except ImportError:
+    minimum_spanning_tree = None
+
+
+def sweep_routes(positions, num_routes=1):
+    """
+    Routes ordered by angle around the depot. Route r starts at the first
+    city past the angle 2*pi*r/num_routes, so the sweeps are rotations.
+    """
+    positions = np.asarray(positions, dtype=float)
+    delta = positions[1:] - positions[0]
+    angles = np.arctan2(delta[:, 1], delta[:, 0])
+    order = np.argsort(angles, kind='stable')
+    base = order + 1
+
+    routes = [base]
+    sorted_angles = angles[order]
+    for r in range(1, num_routes):
+        start = np.searchsorted(sorted_angles, -np.pi + 2 * np.pi * r / num_routes)
+        routes.append(np.roll(base, -start))
+    return routes
+
+
+def nearest_neighbor_routes(distances, starts):
+    """
+    Greedy nearest neighbour routes, all built in lockstep with masked argmin.
+    starts: first city of each route; 0 means "start from the depot"
+    """
+    D = np.asarray(distances, dtype=float)
+    n = len(D)
+    starts = np.asarray(starts, dtype=np.intp)
+    m = len(starts)
+    routes = np.zeros((m, n - 1), dtype=np.intp)
+    if n < 2 or m == 0:
+        return list(routes)
+
+    visited = np.zeros((m, n), dtype=bool)
+    visited[:, 0] = True
+    rows = np.arange(m)
+    visited[rows, starts] = True
+    routes[:, 0] = starts
+    filled = (starts != 0).astype(np.intp)
+    current = starts.copy()
+
+    for _ in range(n - 1):
+        active = filled < n - 1
+        if not active.any():
+            break
+        step = np.where(visited, np.inf, D[current])
+        nxt = np.argmin(step, axis=1)
+        r = rows[active]
+        routes[r, filled[active]] = nxt[active]
+        visited[r, nxt[active]] = True
+        current = np.where(active, nxt, current)
+        filled += active
+    return list(routes)
+
+
+def _minimum_spanning_tree(D):
+    """Children lists of a minimum spanning tree of the complete graph D, rooted at the depot"""
+    n = len(D)
+    if minimum_spanning_tree is not None and n > 1:
+        tree = minimum_spanning_tree(np.where(D > 0, D, 1e-12)).tocoo()
+        children = [[] for _ in range(n)]
+        adjacency = [[] for _ in range(n)]
+        for u, v in zip(tree.row.tolist(), tree.col.tolist()):
+            adjacency[u].append(v)
+            adjacency[v].append(u)
+        parent = [-1] * n
+        parent[0] = 0
+        stack = [0]
+        while stack:
+            u = stack.pop()
+            for v in adjacency[u]:
+                if parent[v] == -1:
+                    parent[v] = u
+                    children[u].append(v)
+                    stack.append(v)
+        return children
+
+    # Prim's algorithm on the dense matrix (NumPy fallback)
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    best = D[0].astype(float).copy()
+    parent = np.zeros(n, dtype=np.intp)
+    children = [[] for _ in range(n)]
+    for _ in range(n - 1):
+        candidates = np.where(in_tree, np.inf, best)
+        v = int(np.argmin(candidates))
+        in_tree[v] = True
+        children[int(parent[v])].append(v)
+        closer = D[v] < best
+        best = np.where(closer, D[v], best)
+        parent = np.where(closer, v, parent)
+    return children
+
+
+def mst_routes(distances, num_routes=1, rng=None):
+    """
+    Preorder walks of a minimum spanning tree rooted at the depot.
+    The first walk visits children closest first, the others in random order.
+    """
+    D = np.asarray(distances, dtype=float)
+    rng = rng or random.Random()
+    children = _minimum_spanning_tree(D)
+
+    routes = []
+    for r in range(num_routes):
+        walk = []
+        stack = [0]
+        while stack:
+            u = stack.pop()
+            if u != 0:
+                walk.append(u)
+            kids = sorted(children[u], key=lambda v: D[u, v])
+            if r > 0:
+                rng.shuffle(kids)
+            stack.extend(reversed(kids))
+        routes.append(np.array(walk, dtype=np.intp))
+    return routes
+
+
+def _trip_cost(cities, precomputed):
+    stops = np.concatenate(([0], cities, [0]))
+    loads = np.concatenate(([0.0], np.cumsum(precomputed.gold_array[cities])))
+    return float(precomputed.calculate_cost_many(stops[:-1], stops[1:], loads).sum())
+
+
+def savings_routes(precomputed, num_routes=1, k=10, noise=0.2, rng=None):
+    """
+    Clarke-Wright savings with the load-dependent TTP cost: trips ending in i
+    and starting in j are merged when the merged trip (at most MAX_TRIP_SIZE
+    cities) is cheaper than the two separate ones. Candidate pairs are the k
+    nearest neighbours, ranked by the exact saving of the two-city merge.
+    Later routes perturb the ranking by up to `noise`.
+    The trips are concatenated by angle of their first city.
+    """
+    n = precomputed.num_cities
+    rng = rng or random.Random()
+    neighbors = precomputed.nearest_neighbors(k)
+    gold = precomputed.gold_array
+    cost = precomputed.calculate_cost_many
+
+    # One-city trips 0 -> c -> 0 and two-city trips 0 -> i -> j -> 0, all at once
+    cities = np.arange(n)
+    depot = np.zeros(n, dtype=np.intp)
+    single = cost(depot, cities, np.zeros(n)) + cost(cities, depot, gold)
+    single[0] = 0.0
+    first = np.repeat(np.arange(1, n), neighbors.shape[1])
+    second = neighbors[1:].ravel().astype(np.intp)
+    pair_cost = (cost(depot[first], first, np.zeros(len(first))) + cost(first, second, gold[first])
+                 + cost(second, depot[first], gold[first] + gold[second]))
+    savings = single[first] + single[second] - pair_cost
+    pairs = list(zip(first.tolist(), second.tolist()))
+    positions = np.asarray(precomputed.problem.positions)
+    angle = np.arctan2(positions[:, 1] - positions[0, 1], positions[:, 0] - positions[0, 0])
+
+    routes = []
+    for r in range(num_routes):
+        ranked = savings if r == 0 else savings * (1 + noise * np.array([rng.random() for _ in range(len(pairs))]))
+        trip_of = list(range(n))
+        trips = {c: [c] for c in range(1, n)}
+        costs = {c: float(single[c]) for c in range(1, n)}
+
+        for idx in np.argsort(-ranked, kind='stable'):
+            if ranked[idx] <= 0:
+                break
+            i, j = pairs[idx]
+            a, b = trip_of[i], trip_of[j]
+            if a == b or trips[a][-1] != i or trips[b][0] != j:
+                continue
+            if len(trips[a]) + len(trips[b]) > MAX_TRIP_SIZE:
+                continue
+            merged = trips[a] + trips[b]
+            merged_cost = _trip_cost(merged, precomputed)
+            if merged_cost < costs[a] + costs[b]:
+                trips[a] = merged
+                costs[a] = merged_cost
+                for c in trips.pop(b):
+                    trip_of[c] = a
+                del costs[b]
+
+        ordered = sorted(trips.values(), key=lambda t: angle[t[0]])
+        routes.append(np.array([c for t in ordered for c in t], dtype=np.intp))
+    return routes
+
+
+def seed_population(problem, precomputed, size, rng=None):
+    """
+    Diverse initial routes: rotated sweeps, multi-start nearest neighbour,
+    MST walks and savings routes (about a tenth of the population each, plus
+    the classic sweep and depot NN route), filled up with perturbed copies.
+    Returns a list of route lists.
+    """
+    rng = rng or random.Random(random.getrandbits(32))
+    n = problem.num_cities
+    share = max(1, size // 10)
+    D = precomputed.all_distances
+
+    starts = [0] + rng.sample(range(1, n), min(share, n - 1)) if n > 1 else [0]
+    seeds = []
+    seeds += sweep_routes(problem.positions, share + 1)
+    seeds += nearest_neighbor_routes(D, starts)
+    seeds += mst_routes(D, share, rng)
+    seeds += savings_routes(precomputed, share, rng=rng)
+
+    population = [route.tolist() for route in seeds][:size]
+    unique = list(population)
+    while len(population) < size:
+        route = rng.choice(unique)[:]
+        # Light perturbation of a seed: swap 10% of the cities
+        for _ in range(len(route) // 10 if len(route) > 1 else 0):
+            i, j = rng.sample(range(len(route)), 2)
+            route[i], route[j] = route[j], route[i]
+        population.append(route)
+    return population
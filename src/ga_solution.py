@@ -1,28 +1,78 @@
-import copy
+from array import array
 import networkx as nx
+from src.evaluation_core import split_path_steps
 
 class TTPSolution:
     """
     Represents a TTP solution, individual in population
     """
-    def __init__(self, route, graph):
+    # Slots keep individuals small: no per-instance __dict__
+    __slots__ = ('route', 'context', 'fitness', 'cost', 'trip_breaks', '_path_steps',
+                 'split_state', 'dirty_from')
+
+    def __init__(self, route, context=None):
+        """
+        route: city indices (permutation, excluding city 0), stored as array('i')
+        context: shared instance data (PrecomputedData); a bare problem graph
+            is accepted too, for code that only needs `graph`
+        """
+        self.route = route if isinstance(route, array) else array('i', route)
+        self.context = context
+        self.fitness = None
+        self.cost = None
+        self.trip_breaks = None  # Split breakpoints [0, ..., n], decoded into path_steps on demand
+        self._path_steps = None  # Final path format [(city, gold), ...]
+        self.split_state = None  # (V, P) of the Split DP, reused by incremental re-evaluation
+        self.dirty_from = None   # First route position changed since split_state was computed
+
+    @property
+    def graph(self):
+        """The problem graph, taken from the shared context"""
+        if isinstance(self.context, nx.Graph):
+            return self.context
+        return getattr(self.context, 'graph', None)
+
+    @property
+    def path_steps(self):
+        """Detailed [(city, gold), ...] path, materialized on first access"""
+        if self._path_steps is None and self.trip_breaks is not None:
+            self._path_steps = split_path_steps(self.route, self.trip_breaks, self.context)
+        return self._path_steps
+
+    @path_steps.setter
+    def path_steps(self, steps):
+        self._path_steps = steps
+        self.trip_breaks = None
+
+    def set_trips(self, trip_breaks, precomputed):
+        """Store the Split result; path_steps will be decoded lazily from it"""
+        self.trip_breaks = trip_breaks
+        self.context = precomputed
+        self._path_steps = None
+
+    def mark_changed(self, position):
         """
-        route: list of city indices (permutation, excluding city 0)
-        graph: the problem graph (for calculating paths/costs)
+        Invalidate the evaluation after changing the route from `position` on.
+        The DP state is kept so the next evaluation only redoes the suffix.
         """
-        self.route = route
-        self.graph = graph
-        self.fitness = None     
-        self.cost = None     
-        self.path_steps = None  # Final path format [(city, gold), ...]
-    
+        self.fitness = None
+        self.cost = None
+        self.trip_breaks = None
+        self._path_steps = None
+        if self.dirty_from is None or position < self.dirty_from:
+            self.dirty_from = position
+
     def copy(self):
-        """Create a deep copy of this solution"""
-        new_sol = TTPSolution(self.route[:], self.graph)
+        """Copy of this solution; only the route is duplicated"""
+        new_sol = TTPSolution(self.route[:], self.context)
         new_sol.fitness = self.fitness
         new_sol.cost = self.cost
-        new_sol.path_steps = self.path_steps[:] if self.path_steps else None
+        # Breakpoints, path and DP state are never modified in place: share them
+        new_sol.trip_breaks = self.trip_breaks
+        new_sol._path_steps = self._path_steps
+        new_sol.split_state = self.split_state
+        new_sol.dirty_from = self.dirty_from
         return new_sol
-    
+
     def __repr__(self):
-        return f"TTPSolution(cost={self.cost:.2f}, route={self.route[:5]}...)"
\ No newline at end of file
+        return f"TTPSolution(cost={self.cost:.2f}, route={list(self.route[:5])}...)"
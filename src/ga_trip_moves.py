@@ -0,0 +1,159 @@
+from src.ga_solution import TTPSolution
+from src.ga_evaluation import evaluate_solution_split
+from src.evaluation_core import MAX_TRIP_SIZE
+
+
+class _TripCosts:
+    """
+    Cost data of one depot -> cities -> depot trip:
+    prefix[k] = cost of the legs up to the arrival at cities[k]
+    loads[k]  = load after collecting cities[0..k]
+    """
+    def __init__(self, cities, model):
+        self.cities = cities
+        self.prefix = []
+        self.loads = []
+        prev, load, cost = 0, 0.0, 0.0
+        for city in cities:
+            cost += model.leg(prev, city, load)
+            self.prefix.append(cost)
+            load += model.gold[city]
+            self.loads.append(load)
+            prev = city
+        self.cost = cost + model.leg(prev, 0, load) if cities else 0.0
+
+
+class _CostModel:
+    """Factorized leg costs d + A * w^beta of a PrecomputedData"""
+    def __init__(self, precomputed):
+        self.D = precomputed.all_distances
+        self.A = precomputed.cost_factor
+        self.beta = precomputed.beta
+        self.gold = precomputed.gold_array.tolist()
+
+    def leg(self, u, v, load):
+        return self.D[u, v] + self.A[u, v] * load ** self.beta
+
+    def cost_with_prefix(self, trip, m, rest):
+        """Cost of the trip that keeps trip.cities[:m] and continues with `rest`"""
+        if m == 0:
+            prev, load, cost = 0, 0.0, 0.0
+            if not rest:
+                return 0.0
+        else:
+            prev, load, cost = trip.cities[m - 1], trip.loads[m - 1], trip.prefix[m - 1]
+        for city in rest:
+            cost += self.leg(prev, city, load)
+            load += self.gold[city]
+            prev = city
+        return cost + self.leg(prev, 0, load)
+
+
+def improve_trips(trips, precomputed, k=8, max_trip_size=None, max_moves=1000):
+    """
+    Inter-trip local search on a trip decomposition (list of city lists).
+    For every city and each of its k nearest neighbours lying in another trip,
+    tries (first improvement):
+    - relocate: move the city just before or after the neighbour
+    - swap: exchange the two cities
+    - 2-opt*: cut both trips there and exchange their tails
+    Deltas only recompute the changed trips from the first modified position,
+    using their stored prefix costs and cumulative loads.
+
+    max_trip_size: optional limit on the cities per trip
+    Returns (trips, total_cost) with empty trips removed.
+    """
+    model = _CostModel(precomputed)
+    trips = [_TripCosts(list(cities), model) for cities in trips if len(cities)]
+    limit = max_trip_size or float('inf')
+    neighbors = precomputed.nearest_neighbors(k).tolist()
+    eps = 1e-9
+
+    where = {}
+    for t, trip in enumerate(trips):
+        for idx, city in enumerate(trip.cities):
+            where[city] = (t, idx)
+
+    moves = 0
+    improved = True
+    while improved and moves < max_moves:
+        improved = False
+        for a in list(where):
+            r, p = where[a]
+            for b in neighbors[a]:
+                if b not in where or where[b][0] == r:
+                    continue
+                s, q = where[b]
+                move = _best_first_move(trips[r], p, trips[s], q, model, limit, eps)
+                if move is None:
+                    continue
+
+                new_r, new_s = move
+                for t, cities in ((r, new_r), (s, new_s)):
+                    trips[t] = _TripCosts(cities, model)
+                    for idx, city in enumerate(cities):
+                        where[city] = (t, idx)
+                moves += 1
+                improved = True
+                break
+            if moves >= max_moves:
+                break
+
+    trips = [trip for trip in trips if trip.cities]
+    return [trip.cities for trip in trips], sum(trip.cost for trip in trips)
+
+
+def _best_first_move(trip_r, p, trip_s, q, model, limit, eps):
+    """First improving (new_r, new_s) for city r[p] and its neighbour s[q], or None"""
+    r, s = trip_r.cities, trip_s.cities
+    a, b = r[p], s[q]
+    old = trip_r.cost + trip_s.cost - eps * (trip_r.cost + trip_s.cost)
+
+    # Removing a from r is shared by both relocations
+    r_without = model.cost_with_prefix(trip_r, p, r[p + 1:])
+    if len(s) + 1 <= limit:
+        for pos in (q, q + 1):
+            rest = [a] + s[pos:]
+            if r_without + model.cost_with_prefix(trip_s, pos, rest) < old:
+                return r[:p] + r[p + 1:], s[:pos] + rest
+
+    # Swap
+    new_r = [b] + r[p + 1:]
+    new_s = [a] + s[q + 1:]
+    if model.cost_with_prefix(trip_r, p, new_r) + model.cost_with_prefix(trip_s, q, new_s) < old:
+        return r[:p] + new_r, s[:q] + new_s
+
+    # 2-opt*: a is followed by b and the rest of s, s keeps its head and gets r's tail
+    if p + 1 + len(s) - q <= limit and q + len(r) - p - 1 <= limit:
+        tail_r, tail_s = s[q:], r[p + 1:]
+        if model.cost_with_prefix(trip_r, p + 1, tail_r) + model.cost_with_prefix(trip_s, q, tail_s) < old:
+            return r[:p + 1] + tail_r, s[:q] + tail_s
+
+    return None
+
+
+def improve_solution_trips(solution, problem, precomputed, cache=None, k=8, max_moves=1000,
+                           stopping=None):
+    """
+    Trip-level improvement of an evaluated GA solution: runs improve_trips on
+    its Split trips (at most MAX_TRIP_SIZE cities each, so Split can rebuild
+    them) and returns the re-split route if it is better, else the solution.
+    stopping: optional StoppingPolicy, charged for the Split evaluations
+    """
+    if solution.fitness is None:
+        evaluate_solution_split(solution, problem, precomputed, cache)
+        if stopping is not None:
+            stopping.add_evaluations()
+    breaks = solution.trip_breaks
+    if breaks is None or len(breaks) < 3:
+        return solution
+
+    route = solution.route
+    trips = [list(route[start:end]) for start, end in zip(breaks, breaks[1:])]
+    trips, _ = improve_trips(trips, precomputed, k=k, max_trip_size=MAX_TRIP_SIZE, max_moves=max_moves)
+
+    candidate = TTPSolution([city for trip in trips for city in trip], precomputed)
+    evaluate_solution_split(candidate, problem, precomputed, cache)
+    if stopping is not None:
+        stopping.add_evaluations()
+    return candidate if candidate.fitness > solution.fitness else solution
@@ -23,16 +23,18 @@ def analyze_problem(p: Problem):
 
 
 def calculate_total_cost(p:Problem, solution_path):
-    total_cost = 0.0
+    graph = p.graph
+    dists = []
+    loads = []
     current_load = 0.0
     current_node = 0  # Start at (0,0)
     
     # The solution_path is a list of tuples: [(node, gold_collected), ...]
     for next_node, collected_gold in solution_path:
         
-        # Calculate cost to move from current_node to next_node
-        segment_cost = p.cost([current_node, next_node], current_load)
-        total_cost += segment_cost
+        # Leg from current_node to next_node, priced all at once below
+        dists.append(nx.path_weight(graph, [current_node, next_node], weight='dist'))
+        loads.append(current_load)
         
         current_node = next_node
         
@@ -41,7 +43,7 @@ def calculate_total_cost(p:Problem, solution_path):
         else:
             current_load += collected_gold # Add gold picked up
             
-    return total_cost
+    return float(p.cost_many(dists, loads).sum())
 
 
 def inspect_graph(p:Problem):
@@ -104,4 +104,82 @@ class FastPackingAnt:
         
         tour.append(0)
         
-        return tour, gold_collected
\ No newline at end of file
+        return tour, gold_collected
+
+class CandidateListAnt(FastPackingAnt):
+    """
+    FastPackingAnt that only scores the k nearest neighbours of the current
+    city (pheromone from a CandidatePheromone). The full unvisited set is used
+    only when every candidate has been visited; non-candidate edges share one
+    pheromone level, so there the choice depends on the heuristic alone.
+    """
+    def __init__(self, precomputed, pheromone_matrix, alpha=1.0, beta=2.5, q0=0.9):
+        super().__init__(precomputed, pheromone_matrix, alpha, beta, q0)
+        self.neighbors = pheromone_matrix.neighbors
+        self.distances = precomputed.all_distances
+        self.golds = np.asarray(precomputed.gold_array, dtype=float)
+    
+    def select_next_city_fast(self, current, visited, current_load):
+        """
+        Same rule as FastPackingAnt.select_next_city_fast, over the unvisited
+        candidates of `current` (visited: boolean mask)
+        """
+        candidates = self.neighbors[current]
+        open_slots = ~visited[candidates]
+        if open_slots.any():
+            cities = candidates[open_slots]
+            tau = self.pheromone.row(current)[open_slots] ** self.alpha
+        else:
+            cities = np.flatnonzero(~visited)
+            if len(cities) == 0:
+                return None
+            tau = 1.0
+        
+        # Same heuristic as calculate_heuristics_vectorized
+        weight_factor = 1.0 + (current_load / (self.data.num_cities + 1e-6))
+        eta = (self.golds[cities] + 1.0) / (self.distances[current, cities] * weight_factor + 1e-6)
+        values = tau * (eta ** self.beta)
+        
+        if random.random() < self.q0:
+            # EXPLOITATION: Choose best
+            return int(cities[np.argmax(values)])
+        
+        # EXPLORATION: Probabilistic
+        cumulative = np.cumsum(values)
+        total = cumulative[-1]
+        if total < 1e-10:
+            return int(random.choice(cities))
+        index = np.searchsorted(cumulative, random.random() * total, side='right')
+        return int(cities[min(index, len(cities) - 1)])
+    
+    def construct_solution_fast(self):
+        """
+        Solution construction in O(k) per step while candidates remain
+        """
+        visited = np.zeros(self.data.num_cities, dtype=bool)
+        visited[0] = True
+        current = 0
+        current_load = 0.0
+        tour = [0]
+        gold_collected = {}
+        
+        for _ in range(self.data.num_cities - 1):
+            next_city = self.select_next_city_fast(current, visited, current_load)
+            
+            if next_city is None:
+                break
+            
+            # Local pheromone update
+            self.pheromone.local_update(current, next_city, rho=0.1)
+            
+            gold_amount = float(self.golds[next_city])
+            tour.append(next_city)
+            gold_collected[next_city] = gold_amount
+            current_load += gold_amount
+            
+            current = next_city
+            visited[next_city] = True
+        
+        tour.append(0)
+        
+        return tour, gold_collected
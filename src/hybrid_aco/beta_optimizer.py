@@ -1,6 +1,9 @@
+from array import array
 import networkx as nx
 import numpy as np
 from src.ga_solution import TTPSolution
+from src.ga_trip_moves import improve_trips
+from src.evaluation_core import returns_cost, returns_path_steps, single_trip_cost
 from src.hybrid_aco.precompute import PrecomputedData
     
 class FastBetaOptimizer:
@@ -24,8 +27,9 @@ class FastBetaOptimizer:
         group_size = n // k
         remainder = n % k
         
-        total_cost = 0.0
         trip_plan = []
+        stops = []
+        golds = []
         start_idx = 0
         
         for i in range(k):
@@ -33,29 +37,17 @@ class FastBetaOptimizer:
             end_idx = start_idx + trip_size
             
             trip_cities = cities[start_idx:end_idx]
-            
-            # Evaluate this trip
-            trip_cost = 0.0
-            current = 0
-            load = 0.0
-            path_seq = []
-            
-            for city in trip_cities:
-                # Fast cost calculation
-                trip_cost += self.data.calculate_cost(current, city, load)
-                gold = gold_collected.get(city, 0)
-                load += gold
-                path_seq.append((city, gold))
-                current = city
-            
-            # Return to depot
-            trip_cost += self.data.calculate_cost(current, 0, load)
+            path_seq = [(city, gold_collected.get(city, 0)) for city in trip_cities]
             path_seq.append((0, 0))
             
             trip_plan.append(path_seq)
-            total_cost += trip_cost
+            stops += [city for city, _ in path_seq]
+            golds += [gold for _, gold in path_seq]
             start_idx = end_idx
         
+        # All k trips priced at once as an explicit-returns tour
+        total_cost = returns_cost(self.data, stops, golds)
+        
         return total_cost, trip_plan
     
     def optimize_trips_fast(self, tour, gold_collected, max_k=15):
@@ -108,10 +100,11 @@ class GA_FastBetaOptimizer:
     def __init__(self, precomputed_data):
         self.data: PrecomputedData = precomputed_data
     
-    def optimize(self, solution: TTPSolution, max_k=15) -> TTPSolution:
+    def optimize(self, solution: TTPSolution, max_k=15, trip_moves=True) -> TTPSolution:
         """
         Optimizes the given GA solution by trying to split the route into k trips.
         Updates the solution in-place if a better configuration is found.
+        trip_moves: refine the best k-split with inter-trip moves (improve_trips)
         """
         route = solution.route
         n = len(route)
@@ -153,10 +146,19 @@ class GA_FastBetaOptimizer:
                 if no_improvement_count >= 3:
                     break
         
-        # 2. If optimization found a better cost than the original GA evaluation, update solution
+        # 2. Move cities between the trips of the best grouping
+        if trip_moves and best_trip_grouping is not None and len(best_trip_grouping) > 1:
+            best_trip_grouping, best_cost = improve_trips(best_trip_grouping, self.data)
+        
+        # 3. If optimization found a better cost than the original GA evaluation, update solution
         current_solution_cost = -solution.fitness if solution.fitness is not None else float('inf')
         
         if best_cost < current_solution_cost:
+            # improve_trips may reorder cities: the route follows the new trips,
+            # and the Split state of the old order no longer applies
+            solution.route = array('i', [city for trip in best_trip_grouping for city in trip])
+            solution.split_state = None
+            solution.dirty_from = None
             solution.cost = best_cost
             solution.fitness = -best_cost
             # Reconstruct the detailed path steps (node-by-node) for the best grouping
@@ -197,52 +199,14 @@ class GA_FastBetaOptimizer:
         """
         Calculates high-level cost for a single trip starting and ending at 0
         """
-        current_node = 0
-        current_load = 0.0
-        trip_cost = 0.0
-        
-        for city in cities:
-            # Add travel cost
-            trip_cost += self.data.calculate_cost(current_node, city, current_load)
-            
-            # Pick up gold
-            gold = self.data.get_gold(city)
-            current_load += gold
-            
-            current_node = city
-            
-        # Return to depot
-        trip_cost += self.data.calculate_cost(current_node, 0, current_load)
-        
-        return trip_cost
+        return single_trip_cost(self.data, cities)
 
     def _reconstruct_detailed_path(self, trip_grouping):
         """
         Reconstructs the full sequence of (node, gold) steps including intermediate nodes
         on shortest paths. Matches the format expected by TTPSolution.path_steps.
         """
-        full_steps = []
-        
+        stops = []
         for trip_cities in trip_grouping:
-            current_node = 0
-            
-            # 1. Go through cities in the trip
-            for target_city in trip_cities:
-                # Get full path steps from current to target (using precomputed shortest paths)
-                path_nodes = self.data.get_path(current_node, target_city)
-                
-                # Append steps. path_nodes includes [start, ..., end]. 
-                # We skip start (index 0) because it was the end of the previous segment.
-                for node in path_nodes[1:]:
-                    gold_amount = self.data.get_gold(node) if node == target_city else 0
-                    full_steps.append((node, gold_amount))
-                
-                current_node = target_city
-            
-            # 2. Return to depot after trip is done
-            path_home = self.data.get_path(current_node, 0)
-            for node in path_home[1:]:
-                # No gold collected on return trip
-                full_steps.append((node, 0))
-                
-        return full_steps
\ No newline at end of file
+            stops += list(trip_cities) + [0]
+        return returns_path_steps(self.data, stops)
@@ -0,0 +1,64 @@
+import numpy as np
+from src.aco_colony import roulette_select
+
+
+def construct_colony_fast(precomputed, pheromone, num_ants, alpha=1.0, beta=2.5, q0=0.9,
+                          local_rho=0.1, rng=None):
+    """
+    Colony construction for the hybrid ACO: all ants advance together with
+    the same rules as FastPackingAnt (q0 exploitation, roulette exploration,
+    all gold collected). The ACS local updates of one step are applied as a
+    single batch after every ant has moved.
+
+    Returns (tours, golds): tours as [0, ..., 0] lists and gold dicts.
+    """
+    tours = construct_colony_tours(precomputed, pheromone, num_ants, alpha, beta, q0, local_rho, rng)
+    return colony_tour_lists(tours, precomputed.gold_array)
+
+
+def construct_colony_tours(precomputed, pheromone, num_ants, alpha=1.0, beta=2.5, q0=0.9,
+                           local_rho=0.1, rng=None):
+    """Array core of construct_colony_fast: ants x (n+1) int32 tours [0, ..., 0]"""
+    rng = rng or np.random.default_rng()
+    n = precomputed.num_cities
+    D = np.asarray(precomputed.all_distances)
+    gold = np.asarray(precomputed.gold_array, dtype=float)
+    tau = pheromone.pheromone
+
+    rows = np.arange(num_ants)
+    visited = np.zeros((num_ants, n), dtype=bool)
+    visited[:, 0] = True
+    current = np.zeros(num_ants, dtype=np.intp)
+    load = np.zeros(num_ants)
+    tours = np.zeros((num_ants, n + 1), dtype=np.int32)
+
+    for step in range(1, n):
+        # Same heuristic as calculate_heuristics_vectorized
+        weight_factor = 1.0 + load / (n + 1e-6)
+        eta = (gold + 1.0) / (D[current] * weight_factor[:, None] + 1e-6)
+        values = (tau[current] ** alpha) * (eta ** beta)
+        values[visited] = 0.0
+
+        # Exploitation: best candidate; exploration: roulette wheel
+        exploit = rng.random(num_ants) < q0
+        best = np.argmax(np.where(visited, -1.0, values), axis=1)
+        empty = values.sum(axis=1) < 1e-10
+        if empty.any():
+            values[empty] = ~visited[empty]
+        next_city = np.where(exploit, best, roulette_select(values, rng))
+
+        pheromone.local_update_many(current, next_city, rho=local_rho)
+
+        tours[:, step] = next_city
+        visited[rows, next_city] = True
+        load += gold[next_city]
+        current = next_city
+
+    return tours
+
+
+def colony_tour_lists(tours, gold):
+    """Tour lists and gold dicts (all the gold of every city) from tour arrays"""
+    golds = np.asarray(gold, dtype=float).tolist()
+    tour_lists = tours.tolist()
+    return tour_lists, [{c: golds[c] for c in tour[1:-1]} for tour in tour_lists]
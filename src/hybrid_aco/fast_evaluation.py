@@ -1,22 +1,11 @@
+from src.evaluation_core import single_trip_cost
+
+
 def evaluate_tour_fast(tour, gold_collected, precomputed):
     """
-    Fast evaluation using precomputed distances and vectorized cost
+    Fast evaluation of a single-trip tour (depot -> cities -> depot)
+    through the shared evaluation core
     """
-    total_cost = 0.0
-    current = 0
-    load = 0.0
-    
     cities = [c for c in tour if c != 0]
-    
-    for city in cities:
-        # Use precomputed cost calculation
-        cost = precomputed.calculate_cost(current, city, load)
-        total_cost += cost
-        
-        load += gold_collected.get(city, 0)
-        current = city
-    
-    # Return home
-    total_cost += precomputed.calculate_cost(current, 0, load)
-    
-    return total_cost
\ No newline at end of file
+    golds = [gold_collected.get(c, 0) for c in cities]
+    return single_trip_cost(precomputed, cities, golds)
@@ -1,11 +1,19 @@
+import copy
 import random
+import numpy as np
 from Problem import Problem
 from src.hybrid_aco.precompute import PrecomputedData
-from src.hybrid_aco.pheromone import PheromoneMatrix
-from src.hybrid_aco.ant import FastPackingAnt
+from src.hybrid_aco.pheromone import PheromoneMatrix, CandidatePheromone
+from src.hybrid_aco.ant import FastPackingAnt, CandidateListAnt
+from src.hybrid_aco.colony import construct_colony_fast, colony_tour_lists
 from src.hybrid_aco.inver_over import inver_over_operator
 from src.hybrid_aco.beta_optimizer import FastBetaOptimizer
 from src.hybrid_aco.fast_evaluation import evaluate_tour_fast
+from src.stopping import StoppingPolicy
+from src.aco_mmas import mmas_bounds, use_best_so_far, is_stagnant
+# Module import: src.aco_parallel imports this package, so its names may
+# not be defined yet when the import cycle starts there
+from src import aco_parallel
 
 def fast_hybrid_aco_ttp(
     problem: Problem,
@@ -17,7 +25,17 @@ def fast_hybrid_aco_ttp(
     rho_global=0.1,
     inver_over_prob=0.5,   
     optimize_trips=True,
-    verbose=True
+    verbose=True,
+    precomputed=None,
+    cache_dir=None,
+    stopping=None,
+    ant_mode='sequential',
+    num_workers=None,
+    candidate_k=None,
+    pheromone_dtype=np.float64,
+    variant='acs',
+    p_best=0.05,
+    stagnation_slack=0.05
 ):
     """
     Optimized hybrid ACO for speed
@@ -28,7 +46,33 @@ def fast_hybrid_aco_ttp(
     3. Reduced iterations
     4. Selective Inver-Over application
     5. Early stopping in beta optimization
+    
+    precomputed / cache_dir: reuse precomputed data, or a persistent cache of it
+    stopping: optional StoppingPolicy for the ant loop. The final trip
+        optimization runs once after it, except when the time budget ended
+        the run (the plain trip plan is returned then)
+    ant_mode: 'sequential' builds one FastPackingAnt at a time, 'colony' moves
+        all ants of an iteration together (construct_colony_fast)
+    num_workers: if > 1, build the ants of each iteration in colony chunks in
+        this many processes (ParallelColony). Each worker applies its ACS
+        local updates to a private copy of the iteration's pheromone.
+    candidate_k: candidate-list mode for large instances. Ants only score the
+        candidate_k nearest neighbours of their city (CandidateListAnt) and
+        pheromone is kept on those edges only, with lazy evaporation
+        (CandidatePheromone). Runs the sequential ant loop.
+    pheromone_dtype: np.float32 stores the pheromone in single precision
+    variant: 'acs' (fixed pheromone bounds) or 'mmas': bounds derived from
+        the best cost (p_best), iteration-best / best-so-far deposit schedule,
+        and a pheromone reset when the branching factor shows stagnation
+        (within stagnation_slack of a single tour). Local updates pull used
+        edges towards the level of the last (re)initialization (tau_max), so
+        stagnation is measured on a copy that only gets the global updates
     """
+    if variant not in ('acs', 'mmas'):
+        raise ValueError(f"unknown variant {variant!r}: use 'acs' or 'mmas'")
+    
+    stopping = stopping or StoppingPolicy()
+    stopping.start()
     
     if verbose:
         print("=" * 70)
@@ -36,12 +80,29 @@ def fast_hybrid_aco_ttp(
         print("=" * 70)
     
     # PRECOMPUTE (this is the key optimization!)
-    precomputed = PrecomputedData(problem)
+    if precomputed is None:
+        precomputed = PrecomputedData(problem, cache_dir=cache_dir)
     
     num_cities = precomputed.num_cities
     
     # Initialize pheromone
-    pheromone = PheromoneMatrix(num_cities, initial_pheromone=0.1)
+    if candidate_k:
+        if ant_mode != 'sequential' or (num_workers is not None and num_workers > 1):
+            raise ValueError("candidate_k runs the sequential ant loop: use ant_mode='sequential' and no num_workers")
+        pheromone = CandidatePheromone(precomputed.nearest_neighbors(candidate_k), initial_pheromone=0.1,
+                                       rho=rho_global, dtype=pheromone_dtype)
+        ant_class = CandidateListAnt
+    else:
+        pheromone = PheromoneMatrix(num_cities, initial_pheromone=0.1, dtype=pheromone_dtype)
+        ant_class = FastPackingAnt
+    
+    parallel = num_workers is not None and num_workers > 1
+    if parallel:
+        ant_mode = 'colony'
+    rng = np.random.default_rng(random.getrandbits(32)) if ant_mode == 'colony' else None
+    pool = None
+    if parallel:
+        pool = aco_parallel.ParallelColony(precomputed, pheromone, num_workers)
     
     # Initialize optimizer
     beta_opt = FastBetaOptimizer(precomputed)
@@ -50,6 +111,8 @@ def fast_hybrid_aco_ttp(
     best_tour = None
     best_gold = None
     best_cost = float('inf')
+    since_reset = None  # MMAS: iterations since the last pheromone (re)initialization
+    trail = None        # MMAS: pheromone with only the global updates (stagnation test)
     
     # Population for Inver-Over 
     population = []
@@ -59,69 +122,107 @@ def fast_hybrid_aco_ttp(
         print(f"Running {num_iterations} iterations with {num_ants} ants...")
         print()
     
-    # Main loop
-    for iteration in range(num_iterations):
-        iteration_tours = []
-        iteration_gold = []
-        iteration_costs = []
-        
-        # Ants construct solutions
-        for ant_id in range(num_ants):
-            ant = FastPackingAnt(precomputed, pheromone, alpha, beta, q0)
-            tour, gold = ant.construct_solution_fast()
-            
-            # Fast evaluation
-            cost = evaluate_tour_fast(tour, gold, precomputed)
+    try:
+        # Main loop
+        for iteration in range(num_iterations):
+            iteration_tours = []
+            iteration_gold = []
+            iteration_costs = []
             
-            iteration_tours.append(tour)
-            iteration_gold.append(gold)
-            iteration_costs.append(cost)
-        
-        # Best in iteration
-        iter_best_idx = iteration_costs.index(min(iteration_costs))
-        iter_best_tour = iteration_tours[iter_best_idx]
-        iter_best_gold = iteration_gold[iter_best_idx]
-        iter_best_cost = iteration_costs[iter_best_idx]
-        
-        # Apply Inver-Over selectively (not every iteration)
-        if random.random() < inver_over_prob and len(population) > 0:
-            # Only a few iterations
-            for _ in range(15): 
-                reference = random.choice(population)
-                iter_best_tour = inver_over_operator(
-                    iter_best_tour, 
-                    reference, 
-                    prob_ref=0.85
+            colony_costs = None
+            if pool is not None:
+                tours, colony_costs = pool.construct_hybrid(pheromone, num_ants, alpha, beta, q0, rng)
+                colony_tours, colony_gold = colony_tour_lists(tours, precomputed.gold_array)
+                colony_costs = colony_costs.tolist()
+            elif ant_mode == 'colony':
+                colony_tours, colony_gold = construct_colony_fast(
+                    precomputed, pheromone, num_ants, alpha, beta, q0, rng=rng
                 )
             
-            # Re-evaluate
-            refined_cost = evaluate_tour_fast(iter_best_tour, iter_best_gold, precomputed)
-            if refined_cost < iter_best_cost:
-                iter_best_cost = refined_cost
-        
-        # Update population (keep small and diverse)
-        population.append(iter_best_tour)
-        if len(population) > max_population:
-            population.pop(0)
-        
-        # Global pheromone update
-        pheromone.global_update(iter_best_tour, iter_best_cost, rho=rho_global)
-        
-        # Update global best
-        if iter_best_cost < best_cost:
-            best_tour = iter_best_tour
-            best_gold = iter_best_gold
-            best_cost = iter_best_cost
+            # Ants construct solutions
+            for ant_id in range(num_ants):
+                if ant_mode == 'colony':
+                    tour, gold = colony_tours[ant_id], colony_gold[ant_id]
+                else:
+                    ant = ant_class(precomputed, pheromone, alpha, beta, q0)
+                    tour, gold = ant.construct_solution_fast()
+                
+                # Fast evaluation (workers already priced theirs)
+                if colony_costs is not None:
+                    cost = colony_costs[ant_id]
+                else:
+                    cost = evaluate_tour_fast(tour, gold, precomputed)
+                
+                iteration_tours.append(tour)
+                iteration_gold.append(gold)
+                iteration_costs.append(cost)
+                stopping.add_evaluations()
+                
+                # Hard time limit: do not wait for the rest of the colony
+                if stopping.out_of_time():
+                    break
+            
+            # Best in iteration
+            iter_best_idx = iteration_costs.index(min(iteration_costs))
+            iter_best_tour = iteration_tours[iter_best_idx]
+            iter_best_gold = iteration_gold[iter_best_idx]
+            iter_best_cost = iteration_costs[iter_best_idx]
+            
+            # Apply Inver-Over selectively (not every iteration)
+            if random.random() < inver_over_prob and len(population) > 0:
+                # Only a few iterations
+                for _ in range(15): 
+                    reference = random.choice(population)
+                    iter_best_tour = inver_over_operator(
+                        iter_best_tour, 
+                        reference, 
+                        prob_ref=0.85
+                    )
+                
+                # Re-evaluate
+                refined_cost = evaluate_tour_fast(iter_best_tour, iter_best_gold, precomputed)
+                stopping.add_evaluations()
+                if refined_cost < iter_best_cost:
+                    iter_best_cost = refined_cost
+            
+            # Update population (keep small and diverse)
+            population.append(iter_best_tour)
+            if len(population) > max_population:
+                population.pop(0)
             
-            if verbose:
-                print(f"Iter {iteration}: New best = {best_cost:.2f}")
+            # Update global best
+            if iter_best_cost < best_cost:
+                best_tour = iter_best_tour
+                best_gold = iter_best_gold
+                best_cost = iter_best_cost
+                
+                if verbose:
+                    print(f"Iter {iteration}: New best = {best_cost:.2f}")
+            
+            # Global pheromone update
+            if variant == 'mmas':
+                since_reset, trail = _mmas_global_update(pheromone, trail, iter_best_tour, iter_best_cost,
+                                                         best_tour, best_cost, since_reset, rho_global,
+                                                         p_best, stagnation_slack, verbose)
+            else:
+                pheromone.global_update(iter_best_tour, iter_best_cost, rho=rho_global)
+            
+            # Progress (less frequent)
+            if verbose and iteration % 10 == 0 and iteration > 0:
+                print(f"Iter {iteration}: Best={best_cost:.2f}")
+            
+            if stopping.should_stop(best_cost):
+                break
         
-        # Progress (less frequent)
-        if verbose and iteration % 10 == 0 and iteration > 0:
-            print(f"Iter {iteration}: Best={best_cost:.2f}")
+        stopping.finish()
+        if verbose:
+            print(stopping.summary())
+    finally:
+        if pool is not None:
+            pool.close()
     
-    # Beta optimization (with early stopping)
-    if optimize_trips and problem.beta > 1.0:
+    # Beta optimization (with early stopping), not past the time budget
+    if optimize_trips and problem.beta > 1.0 and stopping.reason != 'time_budget':
         if verbose:
             print("\nBeta optimization...")
         
@@ -151,6 +252,43 @@ def fast_hybrid_aco_ttp(
     return path_steps, best_cost
 
 
+def _mmas_global_update(pheromone, trail, iter_best_tour, iter_best_cost, best_tour, best_cost,
+                        since_reset, rho, p_best, stagnation_slack, verbose):
+    """
+    MAX-MIN global update on the ACS pheromone. Returns the new number of
+    iterations since the last (re)initialization and the global-update trail.
+
+    ACS local updates pull the edges ants use back towards the reset level
+    (tau_max), so the colony's matrix never shows convergence. Stagnation is
+    measured on `trail`, a copy of the pheromone that only receives the
+    global updates, as in the basic ACO.
+    """
+    tau_min, tau_max = mmas_bounds(best_cost, rho, pheromone.num_cities, 1.0, p_best)
+    if since_reset is None:
+        pheromone.tau0 = tau_max
+        pheromone.reset(tau_max)
+        trail = copy.deepcopy(pheromone)
+        since_reset = 0
+    pheromone.tau_min, pheromone.tau_max = tau_min, tau_max
+    trail.tau_min, trail.tau_max = tau_min, tau_max
+    
+    if use_best_so_far(since_reset):
+        deposit = best_tour, best_cost
+    else:
+        deposit = iter_best_tour, iter_best_cost
+    pheromone.global_update(*deposit, rho=rho)
+    trail.global_update(*deposit, rho=rho)
+    
+    if is_stagnant(trail.levels(), tau_min, tau_max, len(best_tour) - 1, slack=stagnation_slack):
+        if verbose:
+            print(f"Stagnation after {since_reset + 1} iterations: pheromone reset")
+        pheromone.tau0 = tau_max
+        pheromone.reset(tau_max)
+        trail.reset(tau_max)
+        return 0, trail
+    return since_reset + 1, trail
+
+
 def construct_simple_plan_fast(tour, gold_collected, precomputed):
     """Fast simple plan construction"""
     plan = []
@@ -4,11 +4,18 @@ class PheromoneMatrix:
     """
     Pheromone matrix for Ant Colony System (ACS)
     """
-    def __init__(self, num_cities, initial_pheromone=0.1):
+    def __init__(self, num_cities, initial_pheromone=0.1, dtype=np.float64, levels=None):
+        """
+        dtype: np.float32 halves the memory traffic of large matrices
+        levels: existing (num_cities x num_cities) array to use as the matrix
+            (not copied; dtype is ignored then)
+        """
         self.num_cities = num_cities
         self.tau0 = initial_pheromone
-        self.pheromone = np.ones((num_cities, num_cities)) * initial_pheromone
-        np.fill_diagonal(self.pheromone, 0)
+        if levels is None:
+            levels = np.full((num_cities, num_cities), initial_pheromone, dtype=dtype)
+            np.fill_diagonal(levels, 0)
+        self.pheromone = levels
         
         # Minimum pheromone level (for numerical stability)
         self.tau_min = 0.01
@@ -18,6 +25,15 @@ class PheromoneMatrix:
         """Get pheromone level between cities i and j"""
         return self.pheromone[i, j]
     
+    def levels(self):
+        """Current pheromone levels of every stored edge"""
+        return self.pheromone
+    
+    def reset(self, value):
+        """Reinitialize every edge to the same level (e.g. tau_max after stagnation)"""
+        self.pheromone.fill(value)
+        np.fill_diagonal(self.pheromone, 0)
+    
     def local_update(self, i, j, rho=0.1):
         """
         Local pheromone update (ACS variant)
@@ -25,9 +41,21 @@ class PheromoneMatrix:
         
         tau[i,j] = (1-rho)*tau[i,j] + rho*tau0
         """
-        new_val = (1 - rho) * self.pheromone[i, j] + rho * self.tau0
-        self.pheromone[i, j] = np.clip(new_val, self.tau_min, self.tau_max)
-        self.pheromone[j, i] = self.pheromone[i, j]
+        new_val = (1 - rho) * float(self.pheromone[i, j]) + rho * self.tau0
+        # Scalar clamp: np.clip on a single value is much slower
+        new_val = min(max(new_val, self.tau_min), self.tau_max)
+        self.pheromone[i, j] = new_val
+        self.pheromone[j, i] = new_val
+    
+    def local_update_many(self, froms, tos, rho=0.1):
+        """
+        local_update for a batch of edges (one step of every ant of a colony).
+        An edge taken by several ants in the same step is updated once.
+        """
+        new_val = (1 - rho) * self.pheromone[froms, tos] + rho * self.tau0
+        np.clip(new_val, self.tau_min, self.tau_max, out=new_val)
+        self.pheromone[froms, tos] = new_val
+        self.pheromone[tos, froms] = new_val
     
     def global_update(self, best_tour, best_cost, rho=0.1):
         """
@@ -36,18 +64,112 @@ class PheromoneMatrix:
         tau[i,j] = (1-rho)*tau[i,j] + rho*delta_tau
         where delta_tau = 1/best_cost
         """
-        # Evaporate
-        self.pheromone *= (1 - rho)
+        # Evaporate (in place)
+        np.multiply(self.pheromone, 1 - rho, out=self.pheromone)
         
-        # Deposit on best tour
+        # Deposit on best tour, both directions in one scatter
         delta_tau = 1.0 / best_cost
+        tour = np.asarray(best_tour, dtype=np.intp)
+        froms = np.concatenate((tour[:-1], tour[1:]))
+        tos = np.concatenate((tour[1:], tour[:-1]))
+        np.add.at(self.pheromone, (froms, tos), delta_tau)
         
-        for i in range(len(best_tour) - 1):
-            city_from = best_tour[i]
-            city_to = best_tour[i + 1]
-            
-            self.pheromone[city_from, city_to] += delta_tau
-            self.pheromone[city_to, city_from] += delta_tau
+        # Clip to bounds (in place)
+        np.clip(self.pheromone, self.tau_min, self.tau_max, out=self.pheromone)
+
+class CandidatePheromone:
+    """
+    Sparse pheromone for the candidate-list mode: only the edges from every
+    city to its k nearest neighbours carry pheromone, stored as (n x k) arrays
+    aligned with the neighbour lists. Every other edge has a constant level.
+    
+    Evaporation is lazy: each entry keeps the iteration it was last written,
+    and (1-rho)^age is applied (then clipped to tau_min) when it is read or
+    updated, so global_update only touches the edges of the deposited tour.
+    """
+    def __init__(self, neighbors, initial_pheromone=0.1, rho=0.1, dtype=np.float64):
+        self.neighbors = np.asarray(neighbors, dtype=np.int32)
+        self.num_cities = len(self.neighbors)
+        self.tau0 = initial_pheromone
+        self.rho = rho
+        self.values = np.full(self.neighbors.shape, initial_pheromone, dtype=dtype)
+        self.stamp = np.zeros(self.neighbors.shape, dtype=np.int64)
+        self.iteration = 0
         
-        # Clip to bounds
-        self.pheromone = np.clip(self.pheromone, self.tau_min, self.tau_max)
\ No newline at end of file
+        # Minimum pheromone level (for numerical stability)
+        self.tau_min = 0.01
+        self.tau_max = 10.0
+    
+    def row(self, i):
+        """Current pheromone on the candidate edges of city i (evaporation applied)"""
+        age = self.iteration - self.stamp[i]
+        if age.any():
+            self.values[i] = np.maximum(self.values[i] * (1 - self.rho) ** age, self.tau_min)
+            self.stamp[i] = self.iteration
+        return self.values[i]
+    
+    def levels(self):
+        """Current pheromone levels of every candidate edge (n x k), evaporation applied"""
+        age = self.iteration - self.stamp
+        np.maximum(self.values * (1 - self.rho) ** age, self.tau_min, out=self.values)
+        self.stamp.fill(self.iteration)
+        return self.values
+    
+    def reset(self, value):
+        """Reinitialize every candidate edge to the same level"""
+        self.values.fill(value)
+        self.stamp.fill(self.iteration)
+    
+    def slot(self, i, j):
+        """Position of j in the candidate list of i, or -1"""
+        hits = np.flatnonzero(self.neighbors[i] == j)
+        return int(hits[0]) if len(hits) else -1
+    
+    def get(self, i, j):
+        """Get pheromone level between cities i and j"""
+        s = self.slot(i, j)
+        return self.row(i)[s] if s >= 0 else self.tau_min
+    
+    def _slots(self, froms, tos):
+        """(rows, slots) of the candidate edges among froms[k] -> tos[k]"""
+        match = self.neighbors[froms] == tos[:, None]
+        found = match.any(axis=1)
+        return froms[found], match[found].argmax(axis=1)
+    
+    def _refresh(self, rows, slots):
+        """Apply pending evaporation to the given entries"""
+        age = self.iteration - self.stamp[rows, slots]
+        self.values[rows, slots] = np.maximum(self.values[rows, slots] * (1 - self.rho) ** age,
+                                              self.tau_min)
+        self.stamp[rows, slots] = self.iteration
+    
+    def local_update(self, i, j, rho=0.1):
+        """
+        Local pheromone update (ACS variant), on whichever of (i, j) and
+        (j, i) are candidate edges
+        
+        tau[i,j] = (1-rho)*tau[i,j] + rho*tau0
+        """
+        for a, b in ((i, j), (j, i)):
+            s = self.slot(a, b)
+            if s >= 0:
+                new_val = (1 - rho) * self.row(a)[s] + rho * self.tau0
+                self.values[a, s] = min(max(new_val, self.tau_min), self.tau_max)
+    
+    def global_update(self, best_tour, best_cost, rho=0.1):
+        """
+        Global pheromone update (only best ant deposits): one evaporation
+        step for every edge (lazily), then 1/best_cost on the candidate edges
+        of the tour, in both directions
+        """
+        self.rho = rho
+        self.iteration += 1
+        
+        tour = np.asarray(best_tour, dtype=np.intp)
+        froms = np.concatenate((tour[:-1], tour[1:]))
+        tos = np.concatenate((tour[1:], tour[:-1]))
+        rows, slots = self._slots(froms, tos)
+        self._refresh(rows, slots)
+        
+        delta_tau = 1.0 / best_cost
+        self.values[rows, slots] = np.minimum(self.values[rows, slots] + delta_tau, self.tau_max)
@@ -1,39 +1,153 @@
-import networkx as nx
+import os
+import tempfile
 import numpy as np
 from Problem import Problem
 
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import shortest_path
+except ImportError:  # scipy is optional, fall back to a NumPy Floyd-Warshall
+    csr_matrix = None
+
+
+def all_pairs_shortest_paths(num_cities, edge_u, edge_v, edge_dist):
+    """
+    All-pairs shortest paths on an undirected graph given as edge arrays.
+    Returns (distances, predecessors): predecessors[i, j] is the node before j
+    on the shortest path from i to j (-9999 on the diagonal).
+    """
+    if csr_matrix is not None:
+        graph = csr_matrix((edge_dist, (edge_u, edge_v)), shape=(num_cities, num_cities))
+        distances, predecessors = shortest_path(
+            graph, method='D', directed=False, return_predecessors=True
+        )
+        return distances, predecessors.astype(np.int32, copy=False)
+    
+    distances = np.full((num_cities, num_cities), np.inf)
+    predecessors = np.full((num_cities, num_cities), -9999, dtype=np.int32)
+    distances[edge_u, edge_v] = edge_dist
+    distances[edge_v, edge_u] = edge_dist
+    predecessors[edge_u, edge_v] = edge_u
+    predecessors[edge_v, edge_u] = edge_v
+    np.fill_diagonal(distances, 0.0)
+    
+    for k in range(num_cities):
+        via_k = distances[:, k, np.newaxis] + distances[np.newaxis, k, :]
+        shorter = via_k < distances
+        np.copyto(distances, via_k, where=shorter)
+        np.copyto(predecessors, np.broadcast_to(predecessors[k], predecessors.shape), where=shorter)
+    
+    return distances, predecessors
+
+def _load_cached_arrays(cache_dir, fingerprint):
+    """
+    Memory-map cached (distances, predecessors) for an instance, or None.
+    Pages are shared by every process mapping the same files.
+    """
+    folder = os.path.join(cache_dir, fingerprint)
+    try:
+        distances = np.load(os.path.join(folder, 'distances.npy'), mmap_mode='r')
+        predecessors = np.load(os.path.join(folder, 'predecessors.npy'), mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    return distances, predecessors
+
+
+def _store_cached_arrays(cache_dir, fingerprint, distances, predecessors):
+    """
+    Write arrays into the cache. Each file is written to a temporary name and
+    renamed, so concurrent workers never see a partial file.
+    """
+    folder = os.path.join(cache_dir, fingerprint)
+    os.makedirs(folder, exist_ok=True)
+    for name, arr in (('distances.npy', distances), ('predecessors.npy', predecessors)):
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, arr)
+            os.replace(tmp_path, os.path.join(folder, name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
 class PrecomputedData:
     """
     Precompute all expensive calculations once
     """
-    def __init__(self, problem: Problem):
+    def __init__(self, problem: Problem, cache_dir=None):
+        """
+        cache_dir: optional folder for a persistent cache of the shortest path
+            arrays, keyed by problem.fingerprint(). A warm start only memory-maps
+            the stored files.
+        """
         self.problem = problem
-        self.graph = problem.graph
-        self.num_cities = len(problem.graph.nodes)
+        self.num_cities = problem.num_cities
         self.alpha = problem.alpha
         self.beta = problem.beta
-        self.gold = nx.get_node_attributes(self.graph, 'gold')
-        
-        print("Precomputing shortest paths and distances...")
-        
-        # Precompute ALL shortest paths
-        self.all_paths = {}
-        self.all_distances = np.zeros((self.num_cities, self.num_cities))
+        self.gold = dict(enumerate(problem.gold.tolist()))
+        self.gold_array = problem.gold
         
-        for i in range(self.num_cities):
-            paths = nx.single_source_dijkstra_path(self.graph, i, weight='dist')
-            lengths = nx.single_source_dijkstra_path_length(self.graph, i, weight='dist')
+        cached = _load_cached_arrays(cache_dir, problem.fingerprint()) if cache_dir else None
+        if cached is not None:
+            self.all_distances, self.predecessors = cached
+        else:
+            print("Precomputing shortest paths and distances...")
+            
+            # Precompute ALL shortest path lengths plus a predecessor matrix;
+            # paths are rebuilt on demand from the predecessors
+            edge_u, edge_v, edge_dist = problem.edges
+            self.all_distances, self.predecessors = all_pairs_shortest_paths(
+                self.num_cities, edge_u, edge_v, edge_dist
+            )
+            
+            if cache_dir:
+                _store_cached_arrays(cache_dir, problem.fingerprint(), self.all_distances, self.predecessors)
             
-            for j in range(self.num_cities):
-                if i != j:
-                    self.all_paths[(i, j)] = paths[j]
-                    self.all_distances[i, j] = lengths[j]
+            print("Precomputation complete!")
         
-        print("Precomputation complete!")
+        # Factorized cost: d + (alpha*d*w)^beta = d + A[i,j] * w^beta
+        # A only depends on the instance, so the power of the distance is paid once
+        self.cost_factor = (self.alpha * np.asarray(self.all_distances)) ** self.beta
+        self._neighbors = {}
+    
+    @property
+    def graph(self):
+        """The problem graph (built by Problem on first access)"""
+        return self.problem.graph
+    
+    def nearest_neighbors(self, k):
+        """
+        (num_cities x k) array: the k closest cities of every city by shortest
+        path distance, closest first. The depot and the city itself are excluded.
+        """
+        k = min(k, self.num_cities - 2)
+        if k not in self._neighbors:
+            D = np.array(self.all_distances, dtype=float)
+            np.fill_diagonal(D, np.inf)
+            D[:, 0] = np.inf
+            if k > 0:
+                nearest = np.argpartition(D, k - 1, axis=1)[:, :k]
+                order = np.argsort(np.take_along_axis(D, nearest, axis=1), axis=1, kind='stable')
+                nearest = np.take_along_axis(nearest, order, axis=1)
+            else:
+                nearest = np.empty((self.num_cities, 0), dtype=np.intp)
+            self._neighbors[k] = nearest.astype(np.int32)
+        return self._neighbors[k]
     
     def get_path(self, i, j):
-        """Get precomputed path"""
-        return self.all_paths.get((i, j), [i, j])
+        """Get precomputed path (rebuilt from the predecessor matrix)"""
+        if i == j:
+            return [i, j]
+        
+        pred = self.predecessors[i]
+        i, j = int(i), int(j)
+        path = [j]
+        while j != i:
+            j = int(pred[j])
+            path.append(j)
+        path.reverse()
+        return path
     
     def get_distance(self, i, j):
         """Get precomputed distance"""
@@ -49,5 +163,20 @@ class PrecomputedData:
         
         cost = distance + (alpha * distance * load)^beta
         """
-        dist = self.all_distances[i, j]
-        return dist + (self.problem.alpha * dist * load) ** self.problem.beta
\ No newline at end of file
+        return self.all_distances[i, j] + self.cost_factor[i, j] * load ** self.beta
+    
+    def load_power(self, load):
+        """w^beta, to be computed once per load value and reused across legs"""
+        return load ** self.beta
+    
+    def calculate_cost_factored(self, i, j, load_pow):
+        """
+        Cost of a leg given load_power(load) instead of the load itself
+        """
+        return self.all_distances[i, j] + self.cost_factor[i, j] * load_pow
+    
+    def calculate_cost_many(self, froms, tos, loads):
+        """
+        Vectorized version of calculate_cost for arrays of legs
+        """
+        return self.problem.cost_many(self.all_distances[froms, tos], loads)
\ No newline at end of file
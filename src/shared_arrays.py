@@ -0,0 +1,51 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+
+class SharedArrays:
+    """
+    NumPy arrays copied once into shared memory blocks.
+    Worker processes attach to them by name (see attach_shared_arrays)
+    instead of receiving pickled copies.
+    """
+    def __init__(self, arrays):
+        """
+        arrays: dict name -> array
+        """
+        self._blocks = []
+        self.spec = {}
+        self.arrays = {}
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+            view[...] = arr
+            self._blocks.append(shm)
+            self.arrays[name] = view
+            self.spec[name] = (shm.name, arr.shape, arr.dtype.str)
+    
+    def close(self):
+        """Release and destroy the shared blocks (owner side)"""
+        self.arrays = {}
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+
+def attach_shared_arrays(spec):
+    """
+    Attach to blocks created by SharedArrays, from a worker process.
+    Returns (dict name -> read-only array view, list of blocks to keep alive).
+    """
+    arrays = {}
+    blocks = []
+    for name, (shm_name, shape, dtype) in spec.items():
+        # Pool workers share the owner's resource tracker, so attaching does
+        # not transfer ownership: only SharedArrays.close() unlinks the block
+        shm = shared_memory.SharedMemory(name=shm_name)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        view.flags.writeable = False
+        arrays[name] = view
+        blocks.append(shm)
+    return arrays, blocks
@@ -0,0 +1,74 @@
+import time
+
+
+class StoppingPolicy:
+    """
+    Shared stopping rule for the GA, ACO and hybrid ACO loops.
+    Every limit is optional; the solver's own iteration count still applies.
+    After a run, `reason` tells why the loop ended:
+    'time_budget', 'max_evaluations', 'patience', 'target_cost' or 'iterations'.
+    """
+    def __init__(self, time_budget=None, max_evaluations=None, patience=None, target_cost=None):
+        """
+        time_budget: wall-clock seconds for the search loop
+        max_evaluations: maximum number of evaluated solutions (individuals / ants)
+        patience: stop after this many iterations without improving the best cost
+        target_cost: stop as soon as the best cost is at or below this value
+        """
+        self.time_budget = time_budget
+        self.max_evaluations = max_evaluations
+        self.patience = patience
+        self.target_cost = target_cost
+        self.start()
+
+    def start(self):
+        """Reset the counters; called by the solver when its loop begins"""
+        self.start_time = time.perf_counter()
+        self.evaluations = 0
+        self.iterations = 0
+        self.best_cost = float('inf')
+        self.stale_iterations = 0
+        self.reason = None
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def add_evaluations(self, count=1):
+        self.evaluations += count
+
+    def out_of_time(self):
+        """Cheap check usable inside an iteration (e.g. between ants)"""
+        return self.time_budget is not None and self.elapsed >= self.time_budget
+
+    def should_stop(self, best_cost):
+        """
+        Called once at the end of every iteration with the best cost so far.
+        Returns True (and sets `reason`) when a limit is reached.
+        """
+        self.iterations += 1
+        if best_cost < self.best_cost:
+            self.best_cost = best_cost
+            self.stale_iterations = 0
+        else:
+            self.stale_iterations += 1
+
+        if self.target_cost is not None and self.best_cost <= self.target_cost:
+            self.reason = 'target_cost'
+        elif self.out_of_time():
+            self.reason = 'time_budget'
+        elif self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            self.reason = 'max_evaluations'
+        elif self.patience is not None and self.stale_iterations >= self.patience:
+            self.reason = 'patience'
+        return self.reason is not None
+
+    def finish(self):
+        """Close the run: the iteration limit was the reason if nothing else was"""
+        if self.reason is None:
+            self.reason = 'iterations'
+        return self.reason
+
+    def summary(self):
+        return (f"Stopped by {self.reason} after {self.iterations} iterations, "
+                f"{self.evaluations} evaluations, {self.elapsed:.2f}s")